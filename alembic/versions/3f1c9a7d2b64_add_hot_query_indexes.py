@@ -0,0 +1,50 @@
+"""Add indexes for the hot query patterns
+
+Revision ID: 3f1c9a7d2b64
+Revises: 6986413f9937
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = '6986413f9937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_dikaiologitika_user_id_type', 'dikaiologitika', ['user_id', 'type'], None),
+    ('ix_user_answers_user_id_question_id', 'user_answers', ['user_id', 'question_id'], None),
+    ('ix_company_answers_internship_id_question_id', 'company_answers', ['internship_id', 'question_id'], None),
+    ('ix_internships_user_id', 'internships', ['user_id'], None),
+    ('ix_internships_status_department_program', 'internships', ['status', 'department', 'program'], None),
+    ('ix_internships_active_department_program', 'internships', ['department', 'program'], "status = 'ACTIVE'"),
+    ('ix_otps_otp', 'otps', ['otp'], None),
+    ('ix_otps_expiry', 'otps', ['expiry'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the indexes are built in autocommit mode
+    # to avoid locking the tables against writes on Postgres.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,84 @@
+"""Add normalized search columns with trigram indexes
+
+Revision ID: 8b2e4d71c0a9
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 11:02:17.604913
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from core.search import build_search_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d71c0a9'
+down_revision: Union[str, None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, column)
+TRIGRAM_INDEXES = [
+    ('ix_users_search_text_trgm', 'users', 'search_text'),
+    ('ix_users_am_trgm', 'users', 'AM'),
+    ('ix_companies_search_text_trgm', 'companies', 'search_text'),
+]
+
+
+def backfill(table: sa.Table, *columns: str) -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # One set-based UPDATE, doing in SQL what build_search_text does in Python: accents removed,
+        # case folded (including the Greek final sigma) and whitespace collapsed
+        values = ', '.join(f'"{column}"' for column in columns)
+        op.execute(
+            f"UPDATE {table.name} SET search_text = "
+            f"trim(regexp_replace(translate(unaccent(lower(concat_ws(' ', {values}))), 'ς', 'σ'), '\\s+', ' ', 'g'))"
+        )
+        return
+    # Elsewhere (SQLite) the accent folding is done in Python, same as the mapper events
+    if context.is_offline_mode():
+        # Rows cannot be read when generating SQL scripts, new and updated rows are filled by the mapper events
+        return
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(table.c.id, *(table.c[column] for column in columns))).all()
+    for row in rows:
+        connection.execute(
+            table.update().where(table.c.id == row.id).values(search_text=build_search_text(*row[1:]))
+        )
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('search_text', sa.String(), nullable=True))
+    op.add_column('companies', sa.Column('search_text', sa.String(), nullable=True))
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    users = sa.table('users', sa.column('id'), sa.column('AM'), sa.column('first_name'), sa.column('last_name'),
+                     sa.column('search_text'))
+    companies = sa.table('companies', sa.column('id'), sa.column('name'), sa.column('search_text'))
+    backfill(users, 'AM', 'first_name', 'last_name')
+    backfill(companies, 'name')
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(TRIGRAM_INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_column('companies', 'search_text')
+    op.drop_column('users', 'search_text')
@@ -0,0 +1,47 @@
+"""Add the content-addressed blob store of the uploaded files
+
+Revision ID: c5a1f3e8d2b7
+Revises: 8b2e4d71c0a9
+Create Date: 2026-10-17 15:26:48.271935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1f3e8d2b7'
+down_revision: Union[str, None] = '8b2e4d71c0a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sha256')
+    )
+    op.create_index(op.f('ix_blobs_id'), 'blobs', ['id'], unique=False)
+    # Existing files keep their own path, only new uploads are stored as blobs
+    with op.batch_alter_table('dikaiologitika') as batch_op:
+        batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_dikaiologitika_blob_id_blobs', 'blobs', ['blob_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_dikaiologitika_blob_id'), ['blob_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('dikaiologitika') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_dikaiologitika_blob_id'))
+        batch_op.drop_constraint('fk_dikaiologitika_blob_id_blobs', type_='foreignkey')
+        batch_op.drop_column('blob_id')
+    op.drop_index(op.f('ix_blobs_id'), table_name='blobs')
+    op.drop_table('blobs')
@@ -0,0 +1,41 @@
+"""Add the size, checksum and modification time of the dikaiologitika files
+
+Revision ID: e7d4b2a9c613
+Revises: c5a1f3e8d2b7
+Create Date: 2026-10-17 18:04:12.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d4b2a9c613'
+down_revision: Union[str, None] = 'c5a1f3e8d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('dikaiologitika') as batch_op:
+        batch_op.add_column(sa.Column('file_size', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('checksum', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('modified_at', sa.DateTime(), nullable=True))
+    # Files in the blob store take the size, checksum and storage time of their blob,
+    # older files are validated by their stat
+    op.execute(
+        "UPDATE dikaiologitika SET "
+        "file_size = (SELECT blobs.size FROM blobs WHERE blobs.id = dikaiologitika.blob_id), "
+        "checksum = (SELECT blobs.sha256 FROM blobs WHERE blobs.id = dikaiologitika.blob_id), "
+        "modified_at = (SELECT blobs.created_at FROM blobs WHERE blobs.id = dikaiologitika.blob_id) "
+        "WHERE blob_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('dikaiologitika') as batch_op:
+        batch_op.drop_column('modified_at')
+        batch_op.drop_column('checksum')
+        batch_op.drop_column('file_size')
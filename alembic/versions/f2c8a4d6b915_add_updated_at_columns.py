@@ -0,0 +1,31 @@
+"""Add the update time of the users, companies and internships
+
+Revision ID: f2c8a4d6b915
+Revises: e7d4b2a9c613
+Create Date: 2026-10-17 20:12:37.104862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a4d6b915'
+down_revision: Union[str, None] = 'e7d4b2a9c613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are left null, they are covered by the row count of the data version
+    for table_name in ('users', 'companies', 'internships'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in ('internships', 'companies', 'users'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('updated_at')
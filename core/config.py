@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -14,6 +16,62 @@ class Settings(BaseSettings):
 
     # Environment-specific settings
     DATABASE_URL: str
+    # Connection pool settings, applied per worker process
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: int = 30  # Seconds to wait for a connection before failing
+    DATABASE_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced, -1 to disable
+    DATABASE_POOL_PRE_PING: bool = True
+    # Optional read replica for listing / reporting endpoints
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: int = 30  # Fall back to the primary above this replication lag
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: int = 10  # How often the replica health is re-checked
+    # Schema handling at worker startup: create_all is a development-only shortcut,
+    # otherwise the Alembic revision of the database is checked against the code
+    DATABASE_CREATE_ALL: bool = False
+    DATABASE_CHECK_REVISION: bool = True
+    # Per-request query instrumentation (X-DB-Queries / X-DB-Time headers and slow request log)
+    DB_QUERY_METRICS: bool = True
+    DB_SLOW_REQUEST_QUERIES: int = 50  # Log requests issuing more queries than this
+    DB_SLOW_REQUEST_MS: int = 500  # Log requests spending more database time than this
+    DB_REPEATED_STATEMENT_THRESHOLD: int = 10  # Log a statement repeated this often in one request (N+1)
+    # Cache of the total counts of paginated listings and of the dashboard aggregates, per worker process.
+    # A commit only invalidates the entries of the process that made it: the other workers keep serving
+    # their totals until the TTL expires. Entries are filled from the session of the listing, usually the
+    # replica, so a value counted within the replication lag after a write is also kept until the TTL.
+    # The TTL is therefore the bound on the staleness of the totals.
+    DB_COUNT_CACHE: bool = True
+    DB_COUNT_CACHE_TTL_SECONDS: int = 60
+    DB_COUNT_CACHE_MAX_ENTRIES: int = 1024
+    # Background export jobs: the jobs and their finished files are kept in EXPORT_DIR, which must be
+    # shared by the worker processes, and reused for the same filters and data version until they are
+    # older than the TTL. Expired files are removed after the grace period, so running downloads finish.
+    EXPORT_DIR: str = 'exports'
+    EXPORT_WORKERS: int = 2
+    EXPORT_CACHE_TTL_SECONDS: int = 600
+    EXPORT_CACHE_GRACE_SECONDS: int = 600
+    # Supervisor directory, loaded from the aboard API and refreshed in the background
+    SUPERVISORS_URL: str = 'https://aboard.iee.ihu.gr/api/v2/authors'
+    SUPERVISORS_TTL_SECONDS: int = 3600  # Age after which the list is refreshed
+    SUPERVISORS_RETRY_SECONDS: int = 60  # Delay before retrying a failed refresh
+    SUPERVISORS_TIMEOUT_SECONDS: float = 10
+    # Uploaded documents are streamed to disk in chunks and rejected above the size limit
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # Files read concurrently while a bulk archive of documents is written
+    ZIP_READ_WORKERS: int = 4
+    # Where the uploaded documents are stored: 'local' (the files directory) or 's3' (an S3-compatible
+    # object store such as MinIO, shared by every app node, downloads are redirected to presigned URLs).
+    # Switching to 's3' does not move the existing files: copy them with scripts/sync_files_to_storage.py
+    # before the switch and once more right after it (see the script for the cutover steps).
+    STORAGE_BACKEND: str = 'local'
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_BUCKET: Optional[str] = None
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    S3_REGION: str = 'us-east-1'
+    S3_TIMEOUT_SECONDS: float = 30
+    S3_PRESIGNED_URL_TTL_SECONDS: int = 300
     COOKIE_SECURE: bool = False  # Default to False for development
     HTTP_ONLY: bool = False  # Default to False for development
     CORS_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -41,3 +99,4 @@ if settings.ENVIRONMENT == "production":
     settings.CORS_ORIGINS = ["placements.iee.ihu.gr"]
     settings.TRUSTED_HOSTS = ["placements.iee.ihu.gr", "*.placements.iee.ihu.gr"]
     settings.REDIRECT_URI = 'https://placements.iee.ihu.gr/auth'
+    settings.DATABASE_CREATE_ALL = False
@@ -154,3 +154,21 @@ INTERNSHIP_PROGRAM_REQUIREMENTS = {
 
     ],
 }
+
+# Required document types per (program, submission time), precomputed from the mapping above
+REQUIRED_FILE_TYPES = {
+    (program, submission_time): frozenset(
+        requirement['type'] for requirement in requirements
+        if requirement['submission_time'] == submission_time.value
+    )
+    for program, requirements in INTERNSHIP_PROGRAM_REQUIREMENTS.items()
+    for submission_time in SubmissionTime
+}
+
+# Submission time of every document type (by value) per program, END wins for a type required at both times
+FILE_TYPE_SUBMISSION_TIMES = {
+    (program, file_type): submission_time
+    for submission_time in (SubmissionTime.START, SubmissionTime.END)
+    for program in INTERNSHIP_PROGRAM_REQUIREMENTS
+    for file_type in REQUIRED_FILE_TYPES[(program, submission_time)]
+}
@@ -0,0 +1,210 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional, Iterable, Callable, Hashable, TypeVar
+
+from sqlalchemy import event, text, Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql.util import find_tables
+
+from core.config import settings
+
+T = TypeVar('T')
+
+
+class TableVersions:
+    """
+    Change counters of the tables in the current worker process.
+
+    A table's version is bumped when a transaction that wrote to it commits, so anything derived
+    from a table can be cached together with the version it was computed from.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def get(self, tables: Iterable[str]) -> tuple:
+        """
+        Return the current versions of the given tables, in the given order.
+        """
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+table_versions = TableVersions()
+
+
+class CountCache:
+    """
+    Caches the total counts of paginated listings in the current worker process.
+
+    Entries are keyed by the compiled query and its parameters, so each filter combination is
+    cached separately. An entry is only reused while the `table_versions` of all the tables it
+    counts are unchanged and its TTL has not expired. Writes of other processes, and writes not yet
+    on the replica a listing is counted on, are only picked up through the TTL.
+    """
+
+    def __init__(self, enabled: bool, ttl: int, max_entries: int):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def count(self, query: Query) -> int:
+        """
+        Return the number of rows of a query, from the cache when still valid.
+
+        Parameters:
+        - query (Query): The filtered query, before ordering and pagination.
+
+        Returns:
+        - int: The total number of rows.
+        """
+        if not self.enabled:
+            return query.count()
+        statement = query.statement
+        compiled = statement.compile(dialect=query.session.get_bind().dialect)
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        tables = sorted({table.name for table in find_tables(statement, include_joins=True)})
+
+        # The versions are read before counting, so a commit made meanwhile makes the new entry stale
+        versions = table_versions.get(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_versions, expires_at = entry
+                if entry_versions == versions and monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        value = query.count()
+        with self._lock:
+            self._entries[key] = (value, versions, monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+class VersionedCache:
+    """
+    Caches values computed from whole tables, such as aggregates, in the current worker process.
+
+    A value is reused while the `table_versions` of the tables it was computed from are unchanged
+    and its TTL has not expired, so any committed write of this process to those tables invalidates it.
+    As with `CountCache`, writes of other processes or still lagging on the replica wait for the TTL.
+    """
+
+    def __init__(self, enabled: bool, ttl: int):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key: Hashable, tables: Iterable[str], compute: Callable[[], T]) -> T:
+        """
+        Return the cached value of a key, computing it when missing or stale.
+
+        Parameters:
+        - key (Hashable): Identifies the value.
+        - tables (Iterable[str]): The names of the tables the value is computed from.
+        - compute (Callable[[], T]): Computes the value.
+
+        Returns:
+        - T: The cached or freshly computed value.
+        """
+        if not self.enabled:
+            return compute()
+        # The versions are read before computing, so a commit made meanwhile makes the new entry stale
+        versions = table_versions.get(sorted(tables))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_versions, expires_at = entry
+                if entry_versions == versions and monotonic() < expires_at:
+                    return value
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, versions, monotonic() + self.ttl)
+        return value
+
+
+def estimate_count(db: Session, table: Table) -> Optional[int]:
+    """
+    Return the planner's row estimate of a whole table, without counting it.
+
+    Only available on Postgres, where the estimate is kept up to date by autovacuum / ANALYZE.
+
+    Parameters:
+    - db (Session): The database session.
+    - table (Table): The table to estimate.
+
+    Returns:
+    - Optional[int]: The estimated number of rows, or None if no estimate is available.
+    """
+    if db.get_bind().dialect.name != 'postgresql':
+        return None
+    estimate = db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+        {'table_name': table.name}
+    )
+    # reltuples is -1 for tables that were never analyzed
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def count_total(db: Session, query: Query, table: Table, approximate: bool = False) -> int:
+    """
+    Count the total items of a listing, using the planner estimate when allowed.
+
+    Parameters:
+    - db (Session): The database session.
+    - query (Query): The filtered query, before ordering and pagination.
+    - table (Table): The listed table, used for the estimate.
+    - approximate (bool): Whether an estimate is acceptable. Only pass True for unfiltered queries.
+
+    Returns:
+    - int: The exact (possibly cached) or estimated total.
+    """
+    if approximate:
+        estimate = estimate_count(db, table)
+        if estimate is not None:
+            return estimate
+    return count_cache.count(query)
+
+
+count_cache = CountCache(settings.DB_COUNT_CACHE, settings.DB_COUNT_CACHE_TTL_SECONDS,
+                         settings.DB_COUNT_CACHE_MAX_ENTRIES)
+aggregate_cache = VersionedCache(settings.DB_COUNT_CACHE, settings.DB_COUNT_CACHE_TTL_SECONDS)
+
+
+# Tables written by the current transaction of a connection are collected here and only
+# bumped on commit, so a rolled back write keeps the cached values.
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_written_table(conn, cursor, statement, parameters, context, executemany):
+    if context is None or context.compiled is None:
+        return
+    if context.isinsert or context.isupdate or context.isdelete:
+        table = getattr(context.compiled.statement, 'table', None)
+        if table is not None:
+            conn.info.setdefault('written_tables', set()).add(table.name)
+
+
+@event.listens_for(Engine, 'commit')
+def _bump_written_tables(conn):
+    written_tables = conn.info.pop('written_tables', None)
+    if written_tables:
+        table_versions.bump(written_tables)
+
+
+@event.listens_for(Engine, 'rollback')
+def _discard_written_tables(conn):
+    conn.info.pop('written_tables', None)
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Collects connection pool usage for a single engine in the current worker process.
+
+    Checkouts are counted through the pool events, while the time spent waiting for a
+    connection is recorded by `measure_checkout` around the explicit checkout done in `get_db`.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.total_checkouts = 0
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        event.listen(engine, 'checkout', self._on_checkout)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        checked_out = self._pool_value('checkedout')
+        with self._lock:
+            self.total_checkouts += 1
+            if checked_out is not None and checked_out > self.peak_checked_out:
+                self.peak_checked_out = checked_out
+
+    def _pool_value(self, name: str):
+        # Only QueuePool-style pools expose sizing information
+        method = getattr(self.engine.pool, name, None)
+        return method() if callable(method) else None
+
+    @contextmanager
+    def measure_checkout(self):
+        """
+        Record how long the wrapped block waited for a pooled connection.
+        """
+        start = perf_counter()
+        try:
+            yield
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - start
+            with self._lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        """
+        Return the current pool figures of this worker.
+
+        Returns:
+        - dict: Pool configuration, live usage and checkout wait times (in milliseconds).
+        """
+        with self._lock:
+            wait_avg = self.wait_total / self.wait_count if self.wait_count else 0.0
+            return {
+                'pid': os.getpid(),
+                'pool_class': type(self.engine.pool).__name__,
+                'pool_size': self._pool_value('size'),
+                'max_overflow': getattr(self.engine.pool, '_max_overflow', None),
+                'checked_out': self._pool_value('checkedout'),
+                'checked_in': self._pool_value('checkedin'),
+                'overflow': self._pool_value('overflow'),
+                'peak_checked_out': self.peak_checked_out,
+                'total_checkouts': self.total_checkouts,
+                'timeouts': self.timeouts,
+                'wait_count': self.wait_count,
+                'wait_avg_ms': round(wait_avg * 1000, 3),
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+class QueryStats:
+    """
+    Queries issued while serving a single request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.statements[statement] += 1
+
+    def most_repeated(self) -> Optional[tuple]:
+        """
+        Return the most frequently executed statement and its count, or None if nothing ran.
+        """
+        with self._lock:
+            common = self.statements.most_common(1)
+        return common[0] if common else None
+
+
+# Stats of the request being served, None outside instrumented requests
+_current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('current_query_stats', default=None)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_query_stats.get() is not None:
+        conn.info.setdefault('query_start_time', []).append(perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_query_stats.get()
+    start_times = conn.info.get('query_start_time')
+    if stats is not None and start_times:
+        stats.record(statement, perf_counter() - start_times.pop())
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Counts the queries and database time of every request, reports them in the
+    `X-DB-Queries` / `X-DB-Time` response headers and logs requests that exceed the
+    configured thresholds together with their most repeated statement.
+
+    Streaming responses (exports, archives) run most of their queries while the body is sent,
+    after the headers are gone: the headers report the queries run before the response started,
+    the log check runs once the body has been sent and covers every query.
+    """
+
+    def __init__(self, app, max_queries: int, max_time_ms: int, repeated_statement_threshold: int):
+        super().__init__(app)
+        self.max_queries = max_queries
+        self.max_time_ms = max_time_ms
+        self.repeated_statement_threshold = repeated_statement_threshold
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats()
+        token = _current_query_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_query_stats.reset(token)
+
+        response.headers['X-DB-Queries'] = str(stats.count)
+        response.headers['X-DB-Time'] = f"{stats.total_time * 1000:.2f}"
+        # The body runs in the context the stats were set in, so its queries keep being recorded
+        response.body_iterator = self._log_after_body(response.body_iterator, request, stats)
+        return response
+
+    async def _log_after_body(self, body_iterator, request: Request, stats: QueryStats):
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            self._log_if_slow(request, stats, stats.total_time * 1000)
+
+    def _log_if_slow(self, request: Request, stats: QueryStats, time_ms: float):
+        repeated = stats.most_repeated()
+        is_repeated = repeated is not None and repeated[1] >= self.repeated_statement_threshold
+        if stats.count <= self.max_queries and time_ms <= self.max_time_ms and not is_repeated:
+            return
+        message = f"{request.method} {request.url.path} ran {stats.count} queries in {time_ms:.2f}ms"
+        if repeated is not None:
+            statement, times = repeated
+            message += f"; most repeated statement ({times}x): {' '.join(statement.split())}"
+        logger.warning(message)
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from schemas.export_schema import ExportJobStatus
+
+logger = logging.getLogger(__name__)
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ExportJob:
+    """
+    A file export generated in the background.
+    """
+
+    def __init__(self, job_id: str, filename: str, path: str, status: ExportJobStatus = ExportJobStatus.PENDING,
+                 created_at: Optional[datetime] = None, finished_at: Optional[datetime] = None):
+        self.id = job_id
+        self.filename = filename
+        self.path = path
+        self.status = status
+        self.created_at = created_at or datetime.now()
+        self.finished_at = finished_at
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'id': self.id,
+            'filename': self.filename,
+            'path': self.path,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> 'ExportJob':
+        values = json.loads(data)
+        return cls(values['id'], values['filename'], values['path'], ExportJobStatus(values['status']),
+                   datetime.fromisoformat(values['created_at']),
+                   datetime.fromisoformat(values['finished_at']) if values['finished_at'] else None)
+
+
+def read_data_version(db: Session, models: List) -> list:
+    """
+    Read the version of the data of some tables from the database: the row count and the last update
+    time of each, so an insert, update or delete made by any worker process changes it.
+
+    Parameters:
+    - db (Session): The database session, on the primary so the version does not lag behind the writes.
+    - models (List): The models of the exported tables, with an `updated_at` column.
+
+    Returns:
+    - list: The row count and last update time of each table.
+    """
+    return [list(db.query(func.count(), func.max(model.updated_at)).select_from(model).one()) for model in models]
+
+
+class ExportJobManager:
+    """
+    Runs file exports on a worker pool and caches the finished files.
+
+    A job is identified by a hash of its export name, filters and data version, so submitting
+    the same export again while the data has not changed returns the existing job (and its file
+    when finished) instead of generating it again. Finished files expire after `ttl` seconds.
+
+    The jobs are kept in `export_dir` next to their files (`<job id>.json`), so every worker process
+    sharing the directory sees the jobs started by the others. A job is run by the process it was
+    submitted to, a job not finished within `ttl` seconds (its process stopped) can be submitted again.
+    Expired files are only removed once they are older than `ttl` plus `grace` seconds, so a download
+    started before the job expired is not cut off.
+    """
+
+    def __init__(self, export_dir: str, max_workers: int, ttl: int, grace: int):
+        self.export_dir = export_dir
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, name: str, filters: dict, data_version: list, filename: str,
+               build: Callable[[str], None]) -> ExportJob:
+        """
+        Start an export, or return the job of an identical one that is running or still cached.
+
+        Parameters:
+        - name (str): The kind of export, part of the cache key.
+        - filters (dict): The JSON-serializable filters of the export.
+        - data_version (list): The version of the exported data, from `read_data_version`.
+        - filename (str): The name the file is downloaded with.
+        - build (Callable[[str], None]): Writes the export to the given path, called on a worker thread.
+
+        Returns:
+        - ExportJob: The job generating (or holding) the file.
+        """
+        key = json.dumps([name, filters, data_version], sort_keys=True, default=str)
+        job_id = hashlib.sha256(key.encode()).hexdigest()[:32]
+        extension = os.path.splitext(filename)[1]
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.sweep()
+        job = self.get(job_id)
+        if job is not None and job.status != ExportJobStatus.FAILED:
+            return job
+
+        job = ExportJob(job_id, filename, os.path.join(self.export_dir, job_id + extension))
+        if not self._claim(job):
+            # Submitted by another process at the same time
+            return self.get(job_id) or job
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export')
+            self._executor.submit(self._run, job, build)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """
+        Return a job by its ID, or None if it is unknown, expired or abandoned.
+        """
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            job = self._load(job_id)
+        except ValueError:
+            # Being written by the process that claimed it
+            return None
+        return job if job is not None and self._is_current(job) else None
+
+    def sweep(self):
+        """
+        Remove the jobs and files older than the TTL plus the grace period.
+        """
+        removed_before = time.time() - self.ttl - self.grace
+        try:
+            entries = list(os.scandir(self.export_dir))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < removed_before:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Removed by another process
+                pass
+
+    def shutdown(self):
+        """
+        Stop accepting work and cancel the jobs that have not started yet.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _claim(self, job: ExportJob) -> bool:
+        # Created exclusively, so only one process runs the job. A failed, expired or abandoned job
+        # is replaced; two processes replacing it at once only generate the same file twice.
+        job_path = self._job_path(job.id)
+        try:
+            existing = self._load(job.id)
+        except ValueError:
+            return False
+        if existing is not None and (existing.status == ExportJobStatus.FAILED or not self._is_current(existing)):
+            self._remove(job_path)
+        try:
+            fd = os.open(job_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as job_file:
+            job_file.write(job.to_json())
+        return True
+
+    def _run(self, job: ExportJob, build: Callable[[str], None]):
+        job.status = ExportJobStatus.RUNNING
+        self._save(job)
+        # Written under a temporary name, so a partial file is never served
+        partial_path = f"{job.path}.{uuid.uuid4().hex}.part"
+        try:
+            build(partial_path)
+            os.replace(partial_path, job.path)
+            job.status = ExportJobStatus.DONE
+        except Exception:
+            logger.exception(f"Export job {job.id} failed")
+            job.status = ExportJobStatus.FAILED
+            self._remove(partial_path)
+        finally:
+            job.finished_at = datetime.now()
+            self._save(job)
+
+    def _save(self, job: ExportJob):
+        # Replaced atomically, readers never see a partial job file
+        temporary_path = f"{self._job_path(job.id)}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_path, 'w') as job_file:
+            job_file.write(job.to_json())
+        os.replace(temporary_path, self._job_path(job.id))
+
+    def _load(self, job_id: str) -> Optional[ExportJob]:
+        # ValueError while the job file is being written
+        try:
+            with open(self._job_path(job_id)) as job_file:
+                return ExportJob.from_json(job_file.read())
+        except FileNotFoundError:
+            return None
+
+    def _is_current(self, job: ExportJob) -> bool:
+        expired_before = datetime.now() - timedelta(seconds=self.ttl)
+        if job.finished_at is not None:
+            return job.finished_at >= expired_before
+        # A job that did not finish in time was abandoned by its process
+        return job.created_at >= expired_before
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.export_dir, job_id + '.json')
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+export_jobs = ExportJobManager(settings.EXPORT_DIR, settings.EXPORT_WORKERS, settings.EXPORT_CACHE_TTL_SECONDS,
+                               settings.EXPORT_CACHE_GRACE_SECONDS)
@@ -0,0 +1,75 @@
+import logging
+import queue
+import threading
+from typing import Iterable, Optional
+
+from core.storage import StorageBackend, storage
+
+logger = logging.getLogger(__name__)
+
+
+class FileCleanupQueue:
+    """
+    Removes deleted files from the storage on a background thread.
+
+    Deleting rows only queues their files, so a request does not wait for the storage and a rolled
+    back transaction never loses a file: callers enqueue the paths after their commit.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, paths: Iterable[Optional[str]]):
+        """
+        Queue files for removal.
+
+        Parameters:
+        - paths (Iterable[Optional[str]]): The paths of the files, empty ones are skipped.
+        """
+        paths = [path for path in paths if path]
+        if not paths:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='file-cleanup', daemon=True)
+                self._thread.start()
+        for path in paths:
+            self._queue.put(path)
+
+    def join(self):
+        """
+        Wait until every queued file has been handled.
+        """
+        self._queue.join()
+
+    def shutdown(self, timeout: float = 10):
+        """
+        Handle the queued files and stop the worker thread, waiting at most `timeout` seconds.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                if path is None:
+                    return
+                self._remove(path)
+            finally:
+                self._queue.task_done()
+
+    def _remove(self, path: str):
+        try:
+            self.storage.delete(path)
+        except Exception as e:
+            logger.warning(f"Could not remove {path}: {e}")
+
+
+file_cleanup = FileCleanupQueue(storage)
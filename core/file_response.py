@@ -0,0 +1,160 @@
+import re
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from core.storage import StoredFile, storage
+
+# The file may be cached but is revalidated on every use, since it can be replaced or its access revoked
+CACHE_CONTROL = 'private, no-cache'
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileValidators:
+    """
+    The validators of a stored file: its size, entity tag and modification time.
+    """
+
+    def __init__(self, size: int, etag: str, last_modified: datetime):
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def from_checksum(cls, size: int, checksum: str, last_modified: datetime) -> 'FileValidators':
+        """
+        Validators of a file with a known content checksum, which is a strong entity tag.
+        """
+        return cls(size, f'"{checksum}"', last_modified)
+
+    @classmethod
+    def from_stored(cls, stored: StoredFile) -> 'FileValidators':
+        """
+        Validators of a file without a stored checksum, whose entity tag is weak.
+        """
+        return cls(stored.size, f'W/"{stored.size:x}-{int(stored.modified):x}"',
+                   datetime.fromtimestamp(int(stored.modified), timezone.utc))
+
+    @property
+    def is_strong(self) -> bool:
+        return not self.etag.startswith('W/')
+
+    def headers(self) -> dict:
+        return {
+            'ETag': self.etag,
+            'Last-Modified': formatdate(self._timestamp(), usegmt=True),
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': CACHE_CONTROL,
+        }
+
+    def is_not_modified(self, request: Request) -> bool:
+        """
+        Whether the cached copy of the client is current (`If-None-Match`, else `If-Modified-Since`).
+        """
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            # Weak comparison, as required for If-None-Match
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return '*' in tags or self.etag.removeprefix('W/') in tags
+        if_modified_since = _parse_date(request.headers.get('if-modified-since'))
+        return if_modified_since is not None and int(self._timestamp()) <= if_modified_since.timestamp()
+
+    def if_range_matches(self, request: Request) -> bool:
+        """
+        Whether a `Range` request may be served partially, that is the file did not change since the `If-Range`.
+        """
+        if_range = request.headers.get('if-range')
+        if if_range is None:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            # Strong comparison, a weak tag never matches
+            return self.is_strong and if_range == self.etag
+        if_range_date = _parse_date(if_range)
+        return if_range_date is not None and int(self._timestamp()) <= if_range_date.timestamp()
+
+    def _timestamp(self) -> float:
+        last_modified = self.last_modified
+        if last_modified.tzinfo is None:
+            # Stored naive in UTC
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.timestamp()
+
+
+def conditional_file_response(request: Request, key: str, validators: FileValidators, filename: str,
+                              media_type: str) -> Response:
+    """
+    Send a stored file, honouring conditional and range requests.
+
+    A client holding the current copy gets an empty `304 Not Modified` and a satisfiable single
+    `Range` gets `206 Partial Content` with just those bytes, so PDF viewers can fetch the pages
+    they show. Multiple ranges are not supported and get the whole file, which the HTTP spec allows.
+
+    Parameters:
+    - request (Request): The download request.
+    - key (str): The storage key of the file.
+    - validators (FileValidators): The size, entity tag and modification time of the file.
+    - filename (str): The name the file is downloaded as.
+    - media_type (str): The media type of the file.
+
+    Returns:
+    - Response: A 200, 206, 304 or 416 response.
+    """
+    headers = validators.headers()
+    if validators.is_not_modified(request):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    range_header = request.headers.get('range')
+    if range_header is not None and validators.if_range_matches(request):
+        byte_range = _parse_range(range_header, validators.size)
+        if byte_range == ():
+            headers['Content-Range'] = f'bytes */{validators.size}'
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers['Content-Range'] = f'bytes {start}-{end}/{validators.size}'
+            headers['Content-Length'] = str(end - start + 1)
+            return StreamingResponse(storage.read(key, start, end), status_code=status.HTTP_206_PARTIAL_CONTENT,
+                                     headers=headers, media_type=media_type)
+
+    headers['Content-Length'] = str(validators.size)
+    return StreamingResponse(storage.read(key), headers=headers, media_type=media_type)
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple]:
+    # The first and last byte of a single range, () when it is unsatisfiable, None when it is ignored
+    match = _RANGE.match(range_header.replace(' ', ''))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # The last bytes of the file
+        length = int(last)
+        if length == 0 or size == 0:
+            return ()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return ()
+    return start, end
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
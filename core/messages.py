@@ -20,6 +20,7 @@ class Messages:
     UNAUTHORIZED_USER = "Ο χρήστης δεν είναι εξουσιοδοτημένος να εκτελέσει αυτήν την ενέργεια."
     COMPANY_DELETION_FAILED = "Η εταιρεία δεν βρέθηκε ή δεν ήταν δυνατή η διαγραφή της."
     ALL_COMPANIES_RETRIEVED = "Όλες οι εταιρείες ανακτήθηκαν με επιτυχία."
+    COMPANY_SEARCH_RESULTS = "Τα αποτελέσματα της αναζήτησης εταιρειών ανακτήθηκαν με επιτυχία."
     COMPANY_ALREADY_EXISTS = "Μια εταιρεία με αυτό το ΑΦΜ υπάρχει ήδη."
     COMPANY_CREATED_SUCCESS = "Η εταιρεία {company_name} δημιουργήθηκε με επιτυχία."
     COMPANY_UPDATED_SUCCESS = "Η εταιρεία {company_name} ενημερώθηκε με επιτυχία."
@@ -37,6 +38,7 @@ class Messages:
     FILE_ACCESS_FORBIDDEN = "Δεν έχετε άδεια πρόσβασης σε αυτά τα αρχεία."
     FILE_DOWNLOAD_FORBIDDEN = "Δεν έχετε άδεια να κατεβάσετε αυτό το αρχείο."
     FILE_MUST_BE_PDF = "Το αρχείο πρέπει να είναι PDF."
+    FILE_TOO_LARGE = "Το αρχείο ξεπερνά το μέγιστο επιτρεπτό μέγεθος των {max_size_mb} MB."
     FILE_ALREADY_SUBMITTED = "Έχετε ήδη υποβάλει αυτόν τον τύπο αρχείου."
     FILES_RETRIEVED_SUCCESS = "Τα αρχεία ανακτήθηκαν."
     DIKAIOLOGITIKA_TYPES_RETRIEVED_SUCCESS = ("Λίστα όλων των τύπων Δικαιολογητικών για κάθε Πρόγραμμα Πρακτικής "
@@ -46,7 +48,12 @@ class Messages:
     INTERNSHIP_CREATED_OR_UPDATED = "Η πρακτική άσκηση δημιουργήθηκε ή ενημερώθηκε με επιτυχία."
     INTERNSHIP_RETRIEVED_FOR_USER = "Η πρακτική άσκηση ανακτήθηκε για τον χρήστη {user_name}."
     INTERNSHIP_DELETED_SUCCESS = "Η πρακτική άσκηση διαγράφηκε με επιτυχία."
+    INTERNSHIPS_DELETED = "Διαγράφηκαν {deleted} από {total} πρακτικές ασκήσεις."
     INTERNSHIP_STATUS_UPDATED = "Η πρακτική άσκηση ενημερώθηκε με επιτυχία."
+    INTERNSHIPS_STATUS_UPDATED = "Ενημερώθηκαν {updated} από {total} πρακτικές ασκήσεις."
+    REQUIRED_FILES_MISSING = "Δεν υποβλήθηκαν τα απαιτούμενα δικαιολογητικά {submitted}/{required}."
+    INTERNSHIPS_READINESS_RETRIEVED = "Η κατάσταση των δικαιολογητικών των πρακτικών ασκήσεων ανακτήθηκε με επιτυχία."
+    INTERNSHIP_SUMMARY_RETRIEVED = "Τα στατιστικά των πρακτικών ασκήσεων ανακτήθηκαν με επιτυχία."
     OTP_GENERATION_SUCCESS = "Ο κωδικός OTP δημιουργήθηκε με επιτυχία."
     OTP_VALIDATION_SUCCESS = "Η επικύρωση του κωδικού OTP ήταν επιτυχής!"
     INVALID_OR_EXPIRED_OTP = "Μη έγκυρος ή ληγμένος κωδικός OTP."
@@ -65,6 +72,7 @@ class Messages:
     ANSWERS_DELETED_SUCCESS = "Όλες οι απαντήσεις του χρήστη έχουν διαγραφεί."
     DEPARTMENT_TYPES_RETRIEVED = "Λίστα όλων των τύπων Τμημάτων."
     USERS_RETRIEVED_SUCCESS = "Οι χρήστες ανακτήθηκαν με επιτυχία."
+    USER_SEARCH_RESULTS = "Τα αποτελέσματα της αναζήτησης χρηστών ανακτήθηκαν με επιτυχία."
     USER_PROCESSED_SUCCESS = "Ο χρήστης επεξεργάστηκε με επιτυχία."
     USER_RETRIEVED_SUCCESS = "Ο χρήστης ανακτήθηκε με επιτυχία."
     USER_PROMOTED_TO_ADMIN = "Ο χρήστης: {user_name} προήχθη σε διαχειριστή."
@@ -73,4 +81,11 @@ class Messages:
     USER_WITH_SAME_AM_EXISTS = 'Υπάρχει ήδη χρήστης με το υπάρχων ΑΜ.'
     INVALID_ROLE = "Μη έγκυρος ρόλος."
     INVALID_DEPARTMENT = "Μη έγκυρο τμήμα."
+    INVALID_CURSOR = "Μη έγκυρος δείκτης σελίδας."
     NOT_AVAILABLE_ENDPOINT = "Αυτό το endpoint δεν είναι διαθέσιμο στο prodcution !!"
+    EXPORT_JOB_SUBMITTED = "Η εξαγωγή ξεκίνησε. Ελέγξτε την κατάστασή της για να κατεβάσετε το αρχείο."
+    EXPORT_JOB_RETRIEVED = "Η κατάσταση της εξαγωγής ανακτήθηκε με επιτυχία."
+    EXPORT_JOB_NOT_FOUND = "Η εξαγωγή δεν βρέθηκε ή έχει λήξει."
+    EXPORT_NOT_READY = "Το αρχείο της εξαγωγής δεν είναι ακόμη έτοιμο."
+    SUPERVISORS_UNAVAILABLE = "Η λίστα των επιβλεπόντων δεν είναι διαθέσιμη αυτή τη στιγμή."
+    POOL_METRICS_RETRIEVED = "Τα στατιστικά της δεξαμενής συνδέσεων ανακτήθηκαν με επιτυχία."
@@ -0,0 +1,61 @@
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the Alembic environment and revision scripts
+ALEMBIC_SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic')
+
+
+def get_head_revision() -> Optional[str]:
+    """
+    Read the head revision from the local Alembic scripts, without touching the database.
+
+    Returns:
+    - Optional[str]: The head revision identifier, or None if there are no revisions.
+    """
+    # Alembic is only needed for this check, so it is not imported with the module
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory(ALEMBIC_SCRIPT_LOCATION).get_current_head()
+
+
+def get_database_revision(engine: Engine) -> Optional[str]:
+    """
+    Read the revision the database is stamped with, using a single query.
+
+    Parameters:
+    - engine (Engine): The engine of the database to check.
+
+    Returns:
+    - Optional[str]: The revision stored in `alembic_version`, or None if the table is missing or empty.
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.scalar(text("SELECT version_num FROM alembic_version"))
+    except SQLAlchemyError:
+        return None
+
+
+def check_database_revision(engine: Engine) -> None:
+    """
+    Ensure the database schema is at the head Alembic revision before serving traffic.
+
+    Parameters:
+    - engine (Engine): The engine of the database to check.
+
+    Raises:
+    - RuntimeError: If the database revision does not match the head revision of the code.
+    """
+    head_revision = get_head_revision()
+    database_revision = get_database_revision(engine)
+    if database_revision != head_revision:
+        raise RuntimeError(
+            f"Database schema is at revision {database_revision}, expected {head_revision}. "
+            f"Run 'alembic upgrade head' (or 'alembic stamp head' for a schema created with create_all).")
+    logger.info(f"Database schema is at head revision {head_revision}")
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import json
+from typing import Optional, List, Tuple
+
+from fastapi import HTTPException
+from starlette import status
+
+from core.messages import Messages
+
+
+def encode_cursor(last_key: int) -> str:
+    """
+    Build the opaque `after` token pointing right after the row with the given sort key.
+
+    Parameters:
+    - last_key (int): The sort key (primary key) of the last row of a page.
+
+    Returns:
+    - str: The URL-safe cursor token.
+    """
+    payload = json.dumps({'id': last_key}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(after: str) -> int:
+    """
+    Read the sort key from an `after` token.
+
+    Parameters:
+    - after (str): The cursor token returned by a previous page.
+
+    Returns:
+    - int: The sort key of the last row already returned.
+
+    Raises:
+    - HTTPException: If the token is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(after + '=' * (-len(after) % 4)))
+        last_key = payload['id']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_CURSOR)
+    if not isinstance(last_key, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_CURSOR)
+    return last_key
+
+
+def paginate_query(query, key_column, page: Optional[int] = None, items_per_page: Optional[int] = None,
+                   after: Optional[str] = None):
+    """
+    Order a query by its unique sort key and restrict it to the requested page.
+
+    With an `after` token the page starts right after the cursor (keyset pagination), so any
+    page costs the same as the first one. Otherwise `page` / `items_per_page` are applied with an
+    offset as before. One extra row is fetched to know whether a next page exists, so the rows
+    must be passed through `split_page`. Works with both `Query` and `select()` statements.
+
+    Parameters:
+    - query: The filtered query or select statement.
+    - key_column: The unique column the pages are ordered by (the primary key).
+    - page (int, optional): Page number, ignored when `after` is given.
+    - items_per_page (int, optional): Number of items per page. Use -1 (or None) to fetch all items.
+    - after (str, optional): The cursor token of the previous page.
+
+    Returns:
+    - The ordered and limited query.
+    """
+    query = query.order_by(key_column)
+    if after is not None:
+        query = query.where(key_column > decode_cursor(after))
+    elif page is not None and items_per_page is not None:
+        query = query.offset((page - 1) * items_per_page)
+    if items_per_page is not None and items_per_page != -1:
+        query = query.limit(items_per_page + 1)
+    return query
+
+
+def split_page(rows: List, key_column, items_per_page: Optional[int] = None) -> Tuple[List, Optional[str]]:
+    """
+    Drop the extra row fetched by `paginate_query` and build the cursor of the next page.
+
+    Parameters:
+    - rows (List): The rows returned by the paginated query.
+    - key_column: The column the pages are ordered by.
+    - items_per_page (int, optional): Number of items per page.
+
+    Returns:
+    - List: The rows of the page.
+    - Optional[str]: The `after` token of the next page, None on the last page.
+    """
+    if items_per_page is None or items_per_page == -1 or len(rows) <= items_per_page:
+        return rows, None
+    rows = rows[:items_per_page]
+    return rows, encode_cursor(getattr(rows[-1], key_column.key))
@@ -0,0 +1,115 @@
+import unicodedata
+from typing import Optional, Set, List
+
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, Query
+
+# Upper bound for the number of results returned by a search
+SEARCH_MAX_LIMIT = 50
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """
+    Normalize text for accent- and case-insensitive matching (e.g. 'Παπαδόπουλος' -> 'παπαδοπουλοσ').
+
+    Accents are removed through Unicode decomposition, case is folded (which also maps the
+    Greek final sigma to σ) and whitespace is collapsed.
+
+    Parameters:
+    - value (Optional[str]): The text to normalize.
+
+    Returns:
+    - str: The normalized text, empty for None.
+    """
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFD', value)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def build_search_text(*values: Optional[str]) -> str:
+    """
+    Build the normalized search column value from the searchable fields of a row.
+    """
+    return normalize_search_text(' '.join(value for value in values if value))
+
+
+def _trigrams(word: str) -> Set[str]:
+    # Same padding as pg_trgm: two spaces before and one after each word
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(left: str, right: str) -> float:
+    """
+    Trigram similarity between two normalized strings, computed like pg_trgm's `similarity`.
+    Used to rank results on databases without pg_trgm.
+    """
+    left_trigrams = set().union(*(_trigrams(word) for word in left.split())) if left else set()
+    right_trigrams = set().union(*(_trigrams(word) for word in right.split())) if right else set()
+    if not left_trigrams or not right_trigrams:
+        return 0.0
+    return len(left_trigrams & right_trigrams) / len(left_trigrams | right_trigrams)
+
+
+def search_rank(term: str, search_text: str) -> tuple:
+    """
+    Sort key for a search result on databases without pg_trgm, best matches first.
+
+    Words starting with the term rank first, then results by their best word similarity.
+    """
+    words = search_text.split()
+    prefix_match = any(word.startswith(term) for word in words) or search_text.startswith(term)
+    best_similarity = max((trigram_similarity(term, word) for word in words), default=0.0)
+    return not prefix_match, -best_similarity
+
+
+def like_pattern(term: str) -> str:
+    """
+    Build an escaped `LIKE` substring pattern for a normalized term (use with escape='\\\\').
+    """
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def contains_filter(column, term: str):
+    """
+    Filter matching a raw term anywhere in a normalized search column, ignoring accents and case.
+    """
+    return column.like(like_pattern(normalize_search_text(term)), escape='\\')
+
+
+def search_query(db: Session, query: Query, column, term: str, limit: int) -> List:
+    """
+    Run an accent- and case-insensitive substring search on a normalized search column.
+
+    On Postgres the match and the ordering use pg_trgm (served by the GIN trigram index), so
+    near matches such as typos are also returned. Other databases match substrings with `LIKE`
+    and rank a bounded set of candidates in Python.
+
+    Parameters:
+    - db (Session): The database session.
+    - query (Query): The base query of the searched model.
+    - column: The normalized search column (built with `build_search_text`).
+    - term (str): The raw search term.
+    - limit (int): The maximum number of results.
+
+    Returns:
+    - List: The best matching rows, best first.
+    """
+    term = normalize_search_text(term)
+    if not term:
+        return []
+    substring_match = contains_filter(column, term)
+
+    if db.get_bind().dialect.name == 'postgresql':
+        # `term <% column` is true when the term is similar to a word of the column
+        return (query.filter(or_(substring_match, column.op('%>')(term)))
+                .order_by(func.word_similarity(term, column).desc(), column)
+                .limit(limit)
+                .all())
+
+    candidates = query.filter(substring_match).order_by(column).limit(limit * 5).all()
+    candidates.sort(key=lambda row: search_rank(term, getattr(row, column.key)))
+    return candidates[:limit]
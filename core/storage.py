@@ -0,0 +1,325 @@
+import hashlib
+import hmac
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Set
+from urllib.parse import quote, urlsplit
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+# Directory the uploaded files are stored under, the keys of the stored files are their paths
+FILES_ROOT = 'files'
+
+# Size of the pieces stored files are read in
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class StoredFile:
+    """
+    The size and modification time (a UNIX timestamp) of a stored file.
+    """
+
+    def __init__(self, size: int, modified: float):
+        self.size = size
+        self.modified = modified
+
+
+class StorageBackend(ABC):
+    """
+    Where the uploaded files are kept, addressed by key (the `file_path` of the dikaiologitika).
+
+    The methods are blocking: they are called from the sync endpoints and streaming responses,
+    which Starlette runs in the threadpool.
+    """
+
+    @abstractmethod
+    def put_file(self, key: str, source: str):
+        """
+        Store a local file under a key, replacing any file stored under it.
+
+        The source file is moved or copied, the caller removes it if it is still there.
+        """
+
+    @abstractmethod
+    def read(self, key: str, start: int = 0, end: Optional[int] = None,
+             chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Read a stored file, or the bytes `start` to `end` (inclusive) of it, in chunks.
+
+        Raises:
+        - FileNotFoundError: If no file is stored under the key, on the first chunk.
+        """
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[StoredFile]:
+        """
+        Return the size and modification time of a stored file, None if no file is stored under the key.
+        """
+
+    @abstractmethod
+    def delete(self, key: str):
+        """
+        Delete a stored file, a missing file is ignored.
+        """
+
+    def presigned_url(self, key: str, filename: str, media_type: str) -> Optional[str]:
+        """
+        Return a temporary URL the client downloads the file from directly, None if the backend has none.
+        """
+        return None
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def existing(self, keys: Iterable[str]) -> Set[str]:
+        """
+        Return the keys of `keys` a file is stored under.
+        """
+        return {key for key in keys if self.exists(key)}
+
+    def close(self):
+        """
+        Release the resources of the backend.
+        """
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files on the local disk, the key being the path relative to the working directory.
+
+    Deleting a file removes the directories it leaves empty as well, up to `root`.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def put_file(self, key: str, source: str):
+        os.makedirs(os.path.dirname(key) or '.', exist_ok=True)
+        # On the same filesystem the rename is atomic, readers never see a partial file
+        os.replace(source, key)
+
+    def read(self, key: str, start: int = 0, end: Optional[int] = None,
+             chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(key, 'rb') as file:
+            file.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = file.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, key: str) -> Optional[StoredFile]:
+        try:
+            stat_result = os.stat(key)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return StoredFile(stat_result.st_size, stat_result.st_mtime)
+
+    def delete(self, key: str):
+        try:
+            os.remove(key)
+        except FileNotFoundError:
+            pass
+
+        # Remove the directories left empty, without leaving the files root
+        directory = os.path.dirname(os.path.abspath(key))
+        while directory != self.root and directory.startswith(self.root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                # Not empty (or already gone), so neither are its parents
+                break
+            directory = os.path.dirname(directory)
+
+
+class S3Storage(StorageBackend):
+    """
+    Files in a bucket of an S3-compatible object store (AWS S3, MinIO...), shared by every app node.
+
+    Requests are signed with AWS Signature Version 4 and use path-style URLs
+    (`<endpoint>/<bucket>/<key>`), which every S3-compatible store supports. Uploads are streamed
+    from the spooled file with an unsigned payload, downloads are streamed or served by the store
+    through presigned URLs.
+    """
+
+    def __init__(self, endpoint_url: str, bucket: str, access_key: str, secret_key: str, region: str,
+                 timeout: float, presigned_url_ttl: int, concurrency: int = 8):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+        self.presigned_url_ttl = presigned_url_ttl
+        self.concurrency = concurrency
+        self._client: Optional['httpx.Client'] = None
+        self._lock = threading.Lock()
+
+    def put_file(self, key: str, source: str):
+        # The file is sent in chunks, with its length
+        with open(source, 'rb') as file:
+            response = self._request('PUT', key, content=file)
+        response.raise_for_status()
+
+    def read(self, key: str, start: int = 0, end: Optional[int] = None,
+             chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers['range'] = f"bytes={start}-{'' if end is None else end}"
+        url = self._url(key)
+        request = self._get_client().build_request('GET', url, headers=self._sign('GET', url, headers))
+        response = self._get_client().send(request, stream=True)
+        try:
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            response.raise_for_status()
+            yield from response.iter_bytes(chunk_size)
+        finally:
+            response.close()
+
+    def stat(self, key: str) -> Optional[StoredFile]:
+        response = self._request('HEAD', key)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        last_modified = response.headers.get('last-modified')
+        modified = parsedate_to_datetime(last_modified).timestamp() if last_modified else 0
+        return StoredFile(int(response.headers.get('content-length', 0)), modified)
+
+    def delete(self, key: str):
+        response = self._request('DELETE', key)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    def presigned_url(self, key: str, filename: str, media_type: str) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        scope = self._scope(now)
+        query = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f"{self.access_key}/{scope}",
+            'X-Amz-Date': now.strftime('%Y%m%dT%H%M%SZ'),
+            'X-Amz-Expires': str(self.presigned_url_ttl),
+            'X-Amz-SignedHeaders': 'host',
+            'response-content-disposition': f"attachment; filename*=UTF-8''{quote(filename)}",
+            'response-content-type': media_type,
+        }
+        url = self._url(key)
+        canonical_query = _canonical_query(query)
+        signature = self._signature('GET', url, canonical_query, {}, 'UNSIGNED-PAYLOAD', now)
+        return f"{url}?{canonical_query}&X-Amz-Signature={signature}"
+
+    def existing(self, keys: Iterable[str]) -> Set[str]:
+        # One request per key, so they are made concurrently
+        keys = list(keys)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='storage-stat') as executor:
+            found = executor.map(self.exists, keys)
+            return {key for key, exists in zip(keys, found) if exists}
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def _get_client(self) -> 'httpx.Client':
+        with self._lock:
+            if self._client is None:
+                # Only loaded by the S3 backend
+                import httpx
+
+                self._client = httpx.Client(timeout=self.timeout)
+            return self._client
+
+    def _url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{quote(self.bucket)}/{quote(key, safe='/-_.~')}"
+
+    def _request(self, method: str, key: str, headers: Optional[dict] = None, content=None) -> 'httpx.Response':
+        url = self._url(key)
+        return self._get_client().request(method, url, headers=self._sign(method, url, headers or {}),
+                                          content=content)
+
+    def _sign(self, method: str, url: str, headers: dict) -> dict:
+        now = datetime.now(timezone.utc)
+        headers = {
+            **{name.lower(): value for name, value in headers.items()},
+            'host': urlsplit(url).netloc,
+            'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ'),
+            # The payload is streamed, so it is not part of the signature
+            'x-amz-content-sha256': 'UNSIGNED-PAYLOAD',
+        }
+        signature = self._signature(method, url, '', headers, 'UNSIGNED-PAYLOAD', now)
+        headers['authorization'] = (f"AWS4-HMAC-SHA256 Credential={self.access_key}/{self._scope(now)}, "
+                                    f"SignedHeaders={';'.join(sorted(headers))}, Signature={signature}")
+        return headers
+
+    def _signature(self, method: str, url: str, canonical_query: str, headers: dict, payload_hash: str,
+                   now: datetime) -> str:
+        # Only the host is signed for presigned URLs
+        headers = headers or {'host': urlsplit(url).netloc}
+        names = sorted(headers)
+        canonical_request = '\n'.join([
+            method,
+            urlsplit(url).path,
+            canonical_query,
+            ''.join(f"{name}:{str(headers[name]).strip()}\n" for name in names),
+            ';'.join(names),
+            payload_hash,
+        ])
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256',
+            now.strftime('%Y%m%dT%H%M%SZ'),
+            self._scope(now),
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (now.strftime('%Y%m%d'), self.region, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    def _scope(self, now: datetime) -> str:
+        return f"{now.strftime('%Y%m%d')}/{self.region}/s3/aws4_request"
+
+
+def _canonical_query(query: dict) -> str:
+    return '&'.join(f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+                    for name, value in sorted(query.items()))
+
+
+def create_s3_storage() -> S3Storage:
+    """
+    Create the S3 backend from the `S3_*` settings, whatever `STORAGE_BACKEND` is.
+
+    Raises:
+    - RuntimeError: If the endpoint, bucket or credentials are not set.
+    """
+    if not (settings.S3_ENDPOINT_URL and settings.S3_BUCKET and settings.S3_ACCESS_KEY and settings.S3_SECRET_KEY):
+        raise RuntimeError("The S3 storage requires S3_ENDPOINT_URL, S3_BUCKET, S3_ACCESS_KEY and S3_SECRET_KEY")
+    return S3Storage(settings.S3_ENDPOINT_URL, settings.S3_BUCKET, settings.S3_ACCESS_KEY, settings.S3_SECRET_KEY,
+                     settings.S3_REGION, settings.S3_TIMEOUT_SECONDS, settings.S3_PRESIGNED_URL_TTL_SECONDS)
+
+
+def create_storage() -> StorageBackend:
+    """
+    Create the storage backend selected by `STORAGE_BACKEND`.
+
+    Raises:
+    - RuntimeError: If the S3 backend is selected without its endpoint, bucket or credentials.
+    """
+    if settings.STORAGE_BACKEND == 's3':
+        return create_s3_storage()
+    if settings.STORAGE_BACKEND != 'local':
+        raise RuntimeError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND}, expected 'local' or 's3'")
+    return LocalStorage(FILES_ROOT)
+
+
+storage = create_storage()
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, Sequence
+
+from schemas.export_schema import ExportFormat
+
+# Rows fetched from the database and encoded per chunk
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: 'text/csv; charset=utf-8',
+    ExportFormat.NDJSON: 'application/x-ndjson',
+}
+
+
+def _plain(value):
+    # Enum members are exported by value and dates in ISO format, in both formats
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(export_format: ExportFormat, columns: Sequence[str], rows: Iterable[Sequence],
+                rows_per_chunk: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode rows as CSV or NDJSON, chunk by chunk.
+
+    `rows` is consumed lazily and a chunk is produced every `rows_per_chunk` rows, so the first
+    bytes are sent before the query is exhausted and memory use does not grow with the export.
+
+    Parameters:
+    - export_format (ExportFormat): The output format.
+    - columns (Sequence[str]): The column names (CSV header / NDJSON keys).
+    - rows (Iterable[Sequence]): The data rows, in the order of `columns`.
+    - rows_per_chunk (int): How many rows are encoded into each yielded chunk.
+
+    Returns:
+    - Iterator[bytes]: The encoded export.
+    """
+    buffer = io.StringIO()
+    if export_format == ExportFormat.CSV:
+        writer = csv.writer(buffer)
+        # Byte order mark, so Excel opens the (Greek) text as UTF-8
+        buffer.write('\ufeff')
+        writer.writerow(columns)
+
+        def write(row):
+            writer.writerow([_plain(value) for value in row])
+    else:
+        def write(row):
+            buffer.write(json.dumps({column: _plain(value) for column, value in zip(columns, row)},
+                                    ensure_ascii=False, default=str))
+            buffer.write('\n')
+
+    pending = 0
+    for row in rows:
+        write(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
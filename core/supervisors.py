@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import defaultdict
+from time import monotonic
+from typing import TYPE_CHECKING, List, Optional
+
+from fastapi import HTTPException
+from starlette import status
+
+from core.config import settings
+from core.messages import Messages
+from core.search import normalize_search_text
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Longest n-gram kept in the index, longer terms are looked up by their first n-gram and verified
+_MAX_GRAM = 3
+
+
+class SupervisorIndex:
+    """
+    Immutable in-memory substring index of the supervisor names.
+
+    Every 1- to 3-character substring of the normalized names (accents removed, case folded) maps
+    to the names containing it, so a search only verifies the few candidates of the term's first
+    n-gram instead of scanning every name.
+    """
+
+    def __init__(self, names: List[str]):
+        # Duplicates are dropped, the upstream order is kept
+        self.names = list(dict.fromkeys(name for name in names if name))
+        self._normalized = [normalize_search_text(name) for name in self.names]
+        self._grams = defaultdict(set)
+        for position, normalized in enumerate(self._normalized):
+            for size in range(1, _MAX_GRAM + 1):
+                for start in range(len(normalized) - size + 1):
+                    self._grams[normalized[start:start + size]].add(position)
+
+    def search(self, term: Optional[str]) -> List[str]:
+        """
+        Return the names containing the term, ignoring accents and case.
+
+        Names with a word starting with the term come first, then the other matches, each group
+        in the upstream order.
+
+        Parameters:
+        - term (Optional[str]): The search term, all names are returned when empty.
+
+        Returns:
+        - List[str]: The matching names.
+        """
+        term = normalize_search_text(term)
+        if not term:
+            return list(self.names)
+        candidates = self._grams.get(term[:_MAX_GRAM], ())
+        matches = sorted(position for position in candidates if term in self._normalized[position])
+        prefix_matches = {position for position in matches
+                          if any(word.startswith(term) for word in self._normalized[position].split())}
+        ordered = sorted(matches, key=lambda position: position not in prefix_matches)
+        return [self.names[position] for position in ordered]
+
+
+class SupervisorDirectory:
+    """
+    Supervisor names from the aboard API, served from memory.
+
+    The list is loaded on first use and refreshed in the background once it is older than `ttl`
+    (stale-while-revalidate): requests keep being answered from the current snapshot while a
+    single refresh runs. When the upstream fails, the last good snapshot keeps being served and the
+    refresh is retried after `retry_interval`.
+    """
+
+    def __init__(self, url: str, ttl: int, retry_interval: int, timeout: float):
+        self.url = url
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self._index: Optional[SupervisorIndex] = None
+        self._next_refresh = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._client: Optional['httpx.AsyncClient'] = None
+
+    async def search(self, term: Optional[str] = None) -> List[str]:
+        """
+        Search the supervisor names, ignoring accents and case.
+
+        Parameters:
+        - term (Optional[str]): The search term, all names are returned when empty.
+
+        Returns:
+        - List[str]: The matching names.
+
+        Raises:
+        - HTTPException: If the names were never loaded and the upstream is unavailable.
+        """
+        return (await self._get_index()).search(term)
+
+    async def close(self):
+        """
+        Close the pooled HTTP client.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get_index(self) -> SupervisorIndex:
+        if self._index is None:
+            # Nothing to serve yet, so the first load is awaited
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # After a failed first load the upstream is not called again before the retry interval
+                if self._index is None and monotonic() >= self._next_refresh:
+                    await self._refresh()
+            if self._index is None:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                    detail=Messages.SUPERVISORS_UNAVAILABLE)
+        elif monotonic() >= self._next_refresh and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._index
+
+    async def _refresh(self):
+        # Only loaded once the supervisors are fetched
+        import httpx
+
+        try:
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=self.timeout)
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            self._index = SupervisorIndex([supervisor['name'] for supervisor in response.json()])
+            self._next_refresh = monotonic() + self.ttl
+        except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not refresh the supervisors from {self.url}, serving the last snapshot: {e}")
+            self._next_refresh = monotonic() + self.retry_interval
+
+
+supervisor_directory = SupervisorDirectory(settings.SUPERVISORS_URL, settings.SUPERVISORS_TTL_SECONDS,
+                                           settings.SUPERVISORS_RETRY_SECONDS, settings.SUPERVISORS_TIMEOUT_SECONDS)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import uuid
+
+from fastapi import HTTPException, UploadFile
+from starlette import status
+
+from core.config import settings
+from core.messages import Messages
+
+
+class StoredUpload:
+    """
+    A file saved by `save_upload`.
+    """
+
+    def __init__(self, path: str, size: int, checksum: str):
+        self.path = path
+        self.size = size
+        self.checksum = checksum
+
+
+def spool_upload(file: UploadFile, directory: str, max_size: int = None, chunk_size: int = None) -> StoredUpload:
+    """
+    Stream an uploaded file to a new temporary file in a directory.
+
+    The file is copied in fixed-size chunks, so memory use does not grow with the file size. The I/O
+    is blocking: it is called from the endpoints running in the threadpool, where the request body
+    has already been parsed. The SHA-256 checksum is computed while copying.
+    The caller moves the temporary file into place (on the same filesystem, so the rename is atomic)
+    or removes it.
+
+    Parameters:
+    - file (UploadFile): The uploaded file.
+    - directory (str): The directory of the temporary file, created if missing.
+    - max_size (int): The maximum size in bytes, `UPLOAD_MAX_BYTES` by default.
+    - chunk_size (int): The size of the copied chunks, `UPLOAD_CHUNK_BYTES` by default.
+
+    Returns:
+    - StoredUpload: The temporary path, size and checksum of the file.
+
+    Raises:
+    - HTTPException: 413 if the file is larger than `max_size`, nothing is left on disk.
+    """
+    max_size = max_size or settings.UPLOAD_MAX_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_BYTES
+    too_large = HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                              detail=Messages.FILE_TOO_LARGE.format(max_size_mb=max_size // (1024 * 1024)))
+    # The size is known when the multipart parser already spooled the whole file
+    if file.size is not None and file.size > max_size:
+        raise too_large
+
+    os.makedirs(directory or '.', exist_ok=True)
+    partial_path = os.path.join(directory, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial_path, 'wb') as out:
+            while chunk := file.file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise too_large
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        discard_upload(partial_path)
+        raise
+    return StoredUpload(partial_path, size, digest.hexdigest())
+
+
+def discard_upload(path: str):
+    """
+    Remove a temporary upload file, if it still exists.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,169 @@
+import itertools
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from time import time
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.storage import storage
+
+# Size of the pieces the files are read and yielded in
+ZIP_CHUNK_SIZE = 256 * 1024
+# Larger files are not read ahead but read while they are written, to bound the memory used
+READ_AHEAD_MAX_BYTES = 16 * 1024 * 1024
+
+
+class ChunkSink:
+    """
+    Write-only file object collecting what a zip writer produces until it is drained.
+
+    It is not seekable, so the zip writer streams each entry with a data descriptor after its data
+    instead of going back to patch the local header.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def unique_arcname(name: str, used: set) -> str:
+    """
+    Return `name`, or `name (2)`, `name (3)`... (before the extension) if it is already in `used`.
+    """
+    arcname = name
+    base, extension = os.path.splitext(name)
+    counter = 2
+    while arcname in used:
+        arcname = f"{base} ({counter}){extension}"
+        counter += 1
+    used.add(arcname)
+    return arcname
+
+
+def stream_zip(files: Iterable[Tuple[Union[str, bytes], str]], chunk_size: int = ZIP_CHUNK_SIZE,
+               read_ahead: int = 0) -> Iterator[bytes]:
+    """
+    Generate a zip archive of stored files, chunk by chunk.
+
+    Every entry is written as a local header, the file read in `chunk_size` pieces and a data
+    descriptor, and the central directory comes last, so the archive is never held in memory or
+    written to disk and the first bytes are produced before the files are read. Entries are
+    STORED, since the archived documents (PDFs) are already compressed. Repeated names get a
+    ` (2)`, ` (3)`... suffix and files missing from the storage are skipped.
+
+    With `read_ahead`, the next files are read concurrently on worker threads while the current
+    one is written, so the archive is produced at disk speed instead of one read at a time. Only
+    files up to `READ_AHEAD_MAX_BYTES` are read ahead, which bounds the memory used.
+
+    Parameters:
+    - files (Iterable[Tuple[Union[str, bytes], str]]): The storage key (or the content) of every file and
+      its name in the archive, consumed lazily.
+    - chunk_size (int): The size of the pieces the files are read in.
+    - read_ahead (int): How many files are read ahead, 0 to read every file when it is written.
+
+    Returns:
+    - Iterator[bytes]: The parts of the zip archive.
+    """
+    sink = ChunkSink()
+    used_names = set()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, modified, size, chunks in _read_files(files, chunk_size, read_ahead):
+            entry = zipfile.ZipInfo(unique_arcname(name, used_names),
+                                    date_time=datetime.fromtimestamp(modified).timetuple()[:6])
+            entry.compress_type = zipfile.ZIP_STORED
+            # Known upfront, so the writer picks the ZIP64 format only for large files
+            entry.file_size = size
+            with archive.open(entry, 'w') as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    yield sink.drain()
+            # The data descriptor of the entry
+            yield sink.drain()
+    # The central directory
+    yield sink.drain()
+
+
+def _read_files(files: Iterable[Tuple[Union[str, bytes], str]], chunk_size: int,
+                read_ahead: int) -> Iterator[Tuple[str, float, int, Iterable[bytes]]]:
+    # Yields the name, modification time, size and content chunks of every file, in order
+    if read_ahead <= 0:
+        for source, name in files:
+            if isinstance(source, bytes):
+                yield name, time(), len(source), _split(source, chunk_size)
+                continue
+            stored = storage.stat(source)
+            if stored is None:
+                continue
+            chunks = _open(source, chunk_size)
+            if chunks is None:
+                continue
+            yield name, stored.modified, stored.size, chunks
+        return
+
+    with ThreadPoolExecutor(max_workers=read_ahead, thread_name_prefix='zip-read') as executor:
+        pending = deque()
+        for source, name in files:
+            pending.append((source, name, executor.submit(_load, source)))
+            if len(pending) > read_ahead:
+                yield from _loaded(*pending.popleft(), chunk_size)
+        while pending:
+            yield from _loaded(*pending.popleft(), chunk_size)
+
+
+def _load(source: Union[str, bytes]) -> Optional[Tuple[float, int, Optional[bytes]]]:
+    if isinstance(source, bytes):
+        return time(), len(source), source
+    stored = storage.stat(source)
+    if stored is None:
+        return None
+    if stored.size > READ_AHEAD_MAX_BYTES:
+        return stored.modified, stored.size, None
+    try:
+        return stored.modified, stored.size, b''.join(storage.read(source))
+    except FileNotFoundError:
+        return None
+
+
+def _loaded(source: Union[str, bytes], name: str, future: Future, chunk_size: int):
+    loaded = future.result()
+    if loaded is None:
+        return
+    modified, size, content = loaded
+    if content is None:
+        # Too large to be held in memory, read while written
+        chunks = _open(source, chunk_size)
+        if chunks is not None:
+            yield name, modified, size, chunks
+    else:
+        yield name, modified, len(content), _split(content, chunk_size)
+
+
+def _open(key: str, chunk_size: int) -> Optional[Iterator[bytes]]:
+    # The file is opened before its entry is written, so a file deleted since it was listed is
+    # skipped instead of cutting the archive off after the entry header
+    reader = storage.read(key, chunk_size=chunk_size)
+    try:
+        first = next(reader)
+    except FileNotFoundError:
+        return None
+    except StopIteration:
+        return iter(())
+    return itertools.chain([first], reader)
+
+
+def _split(content: bytes, chunk_size: int) -> Iterator[bytes]:
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
@@ -0,0 +1,144 @@
+import os
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List
+
+from fastapi import UploadFile
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.file_cleanup import file_cleanup
+from core.storage import FILES_ROOT, storage
+from core.uploads import spool_upload, discard_upload, StoredUpload
+from models import Blob
+
+# Directory of the blob files, stored by the SHA-256 of their content
+BLOBS_DIR = os.path.join(FILES_ROOT, 'blobs')
+
+# Session info key of the files stored for new blobs, removed again if the blobs are not committed
+_NEW_BLOB_PATHS = 'new_blob_paths'
+
+
+def get_blob_path(checksum: str) -> str:
+    """
+    Return a new path for a blob with the given SHA-256, fanned out by its first two characters.
+
+    The path is unique to the blob row: once a blob is released its file is deleted in the background,
+    so a blob stored again with the same content must not share the path of the deleted one.
+    """
+    return os.path.join(BLOBS_DIR, checksum[:2], f"{checksum}-{uuid.uuid4().hex}.pdf")
+
+
+def store_upload(db: Session, file: UploadFile) -> Blob:
+    """
+    Store an uploaded file in the blob store and take a reference to it.
+
+    The upload is streamed to a temporary file while its checksum is computed. When a blob with
+    the same content already exists, the temporary file is dropped and the existing copy is reused,
+    otherwise the file is put in the storage as a new blob (a rename for the local storage). The reference is flushed but not
+    committed: the caller commits it together with the dikaiologitika pointing at the blob.
+
+    Parameters:
+    - db (Session): Database session.
+    - file (UploadFile): The uploaded file.
+
+    Returns:
+    - Blob: The blob holding the content of the file.
+
+    Raises:
+    - HTTPException: 413 if the file is larger than the upload limit.
+    """
+    # Spooled next to the local blobs, so the local storage moves it into place with a rename
+    upload = spool_upload(file, BLOBS_DIR)
+    try:
+        return acquire_blob(db, upload)
+    finally:
+        discard_upload(upload.path)
+
+
+def acquire_blob(db: Session, upload: StoredUpload) -> Blob:
+    """
+    Take a reference to the blob of a spooled upload, creating the blob when its content is new.
+
+    Parameters:
+    - db (Session): Database session.
+    - upload (StoredUpload): The spooled upload, put in the storage when its content is new.
+
+    Returns:
+    - Blob: The blob holding the content of the upload.
+    """
+    # The row lock keeps a concurrent release from deleting the blob before the reference is taken
+    blob = db.query(Blob).filter(Blob.sha256 == upload.checksum).with_for_update().first()
+    if blob is not None:
+        if not storage.exists(blob.path):
+            # The stored copy went missing, the upload restores it
+            storage.put_file(blob.path, upload.path)
+        blob.ref_count = Blob.ref_count + 1
+        db.flush()
+        return blob
+
+    path = get_blob_path(upload.checksum)
+    storage.put_file(path, upload.path)
+    # Removed when the transaction ends without committing the blob
+    db.info.setdefault(_NEW_BLOB_PATHS, []).append(path)
+    blob = Blob(sha256=upload.checksum, size=upload.size, path=path, ref_count=1, created_at=datetime.utcnow())
+    try:
+        with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        # Stored concurrently by an identical upload, whose blob is used and our copy dropped
+        db.info[_NEW_BLOB_PATHS].remove(path)
+        file_cleanup.enqueue([path])
+        blob = db.query(Blob).filter(Blob.sha256 == upload.checksum).with_for_update().one()
+        blob.ref_count = Blob.ref_count + 1
+        db.flush()
+    return blob
+
+
+def release_blobs(db: Session, blob_ids: Iterable[int]) -> List[str]:
+    """
+    Drop references to blobs and delete the blobs that are no longer referenced.
+
+    Nothing is committed: the caller commits together with the change that dropped the references
+    and then removes the returned files from the storage (see `file_cleanup`).
+
+    Parameters:
+    - db (Session): Database session.
+    - blob_ids (Iterable[int]): The blob of every dropped reference, repeated for multiple references.
+
+    Returns:
+    - List[str]: The paths of the deleted blobs.
+    """
+    references = Counter(blob_id for blob_id in blob_ids if blob_id is not None)
+    if not references:
+        return []
+    # One UPDATE per distinct number of dropped references, usually just one
+    ids_by_count = {}
+    for blob_id, count in references.items():
+        ids_by_count.setdefault(count, []).append(blob_id)
+    for count, ids in ids_by_count.items():
+        db.query(Blob).filter(Blob.id.in_(ids)).update({Blob.ref_count: Blob.ref_count - count},
+                                                       synchronize_session=False)
+
+    unreferenced = db.query(Blob.id, Blob.path).filter(Blob.id.in_(references), Blob.ref_count <= 0).all()
+    if not unreferenced:
+        return []
+    db.query(Blob).filter(Blob.id.in_([blob.id for blob in unreferenced])).delete(synchronize_session=False)
+    return [blob.path for blob in unreferenced]
+
+
+@event.listens_for(Session, 'after_commit')
+def _keep_new_blob_files(session: Session):
+    # Also called when a savepoint is released, the files are only kept by the outermost commit
+    if not session.in_nested_transaction():
+        session.info.pop(_NEW_BLOB_PATHS, None)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _remove_uncommitted_blob_files(session: Session, transaction):
+    # The outermost transaction ended without a commit (rolled back, or the session closed after an
+    # error), so no row points at the files stored for its new blobs
+    if transaction.parent is None:
+        file_cleanup.enqueue(session.info.pop(_NEW_BLOB_PATHS, []))
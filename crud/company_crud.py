@@ -2,16 +2,37 @@ from typing import Optional, Type, List
 
 from sqlalchemy.orm import Session
 
+from core.count_cache import count_total
+from core.pagination import paginate_query, split_page
+from core.search import search_query, contains_filter
 from models import Companies
 from schemas.company_schema import CompanyBase
 
 
+def filter_companies(query, name: Optional[str] = None):
+    """
+    Apply the company listing filters to a query of companies (or of company columns).
+
+    Parameters:
+    - query (Query): The query to filter.
+    - name (str, optional): Filter companies by name.
+
+    Returns:
+    - Query: The filtered query.
+    """
+    if name:
+        query = query.filter(contains_filter(Companies.search_text, name))
+    return query
+
+
 def get_all_companies(
         db: Session,
         name: Optional[str] = None,
         page: Optional[int] = None,
-        items_per_page: Optional[int] = None
-) -> (List[Type[Companies]], int):
+        items_per_page: Optional[int] = None,
+        after: Optional[str] = None,
+        approximate_count: bool = False
+) -> (List[Type[Companies]], int, Optional[str]):
     """
     Retrieves all companies from the database with optional name filtering and pagination.
 
@@ -20,30 +41,37 @@ def get_all_companies(
     - name (str, optional): Filter companies by name.
     - page (int, optional): Page number for pagination.
     - items_per_page (int, optional): Number of items per page. Use -1 to fetch all items without pagination.
+    - after (str, optional): Cursor of the previous page, used instead of `page` when given.
+    - approximate_count (bool): Use the planner estimate as total when no filter is given.
 
     Returns:
     - list: A list of company instances.
     - int: Total number of companies.
+    - Optional[str]: The cursor of the next page, None on the last page.
     """
-    query = db.query(Companies)
+    query = filter_companies(db.query(Companies), name)
 
-    if name:
-        query = query.filter(Companies.name.ilike(f"%{name}%"))
+    total_items = count_total(db, query, Companies.__table__, approximate=approximate_count and not name)
 
-    total_items = query.count()
+    companies = paginate_query(query, Companies.id, page, items_per_page, after).all()
+    companies, next_cursor = split_page(companies, Companies.id, items_per_page)
 
-    if page is not None and items_per_page is not None:
-        offset = (page - 1) * items_per_page
-        if items_per_page == -1:
-            # Fetch all items without limiting
-            query = query.offset(offset)
-        else:
-            # Apply limit and offset for pagination
-            query = query.offset(offset).limit(items_per_page)
+    return companies, total_items, next_cursor
 
-    companies = query.all()
 
-    return companies, total_items
+def search_companies(db: Session, term: str, limit: int) -> List[Companies]:
+    """
+    Search companies by name, ignoring accents and case.
+
+    Parameters:
+    - db (Session): Database session.
+    - term (str): The search term, matched anywhere in the company name.
+    - limit (int): The maximum number of companies to return.
+
+    Returns:
+    - List[Companies]: The matching companies, best matches first.
+    """
+    return search_query(db, db.query(Companies), Companies.search_text, term, limit)
 
 
 def get_company_by_AFM(db: Session, AFM: str) -> Optional[Companies]:
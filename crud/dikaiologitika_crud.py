@@ -3,46 +3,33 @@ from typing import Optional, List, Type
 
 import pytz
 from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette import status
 
-from core.constants import INTERNSHIP_PROGRAM_REQUIREMENTS
-from models import Dikaiologitika, DikaiologitikaType, InternshipProgram, SubmissionTime
+from core.constants import FILE_TYPE_SUBMISSION_TIMES
+from core.file_cleanup import file_cleanup
+from crud.blob_crud import release_blobs
+from models import Dikaiologitika, DikaiologitikaType, InternshipProgram, SubmissionTime, Internship, Users, \
+    Department, InternshipStatus
 from schemas.dikaiologitika_schema import DikaiologitikaCreate
 
 
 def determine_submission_time(internship_program: InternshipProgram,
                               dikaiologitika_type: DikaiologitikaType) -> SubmissionTime:
-    # Retrieve the list of requirements for the specified internship program
-    requirements = INTERNSHIP_PROGRAM_REQUIREMENTS.get(internship_program, [])
-
-    # Initialize variables to store the submission times if found
-    end_submission_time = None
-    start_submission_time = None
-
-    # Iterate through the requirements for the given internship program
-    for requirement in requirements:
-        # Check if the requirement type matches the provided dikaiologitika type
-        if requirement['type'] == dikaiologitika_type.value:
-            # If the submission time is END, store it in end_submission_time
-            if requirement['submission_time'] == SubmissionTime.END.value:
-                end_submission_time = SubmissionTime(requirement['submission_time'])
-            # If the submission time is START, store it in start_submission_time
-            elif requirement['submission_time'] == SubmissionTime.START.value:
-                start_submission_time = SubmissionTime(requirement['submission_time'])
-
-    # Raise an error if no matching submission time is found
-    if end_submission_time:
-        return end_submission_time
-    if start_submission_time:
-        return start_submission_time
+    # Look up the precomputed submission time, END when the type is required at both times
+    submission_time = FILE_TYPE_SUBMISSION_TIMES.get((internship_program, dikaiologitika_type.value))
+    if submission_time:
+        return submission_time
 
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail=f"Submission time not found for type {dikaiologitika_type.value} in program {internship_program.value}")
 
 
 def create_dikaiologitika(db: Session, dikaiologitika: DikaiologitikaCreate, user_id: int,
-                          file_path: str, file_name: str, internship_program: InternshipProgram) -> Dikaiologitika:
+                          file_path: str, file_name: str, internship_program: InternshipProgram,
+                          blob_id: Optional[int] = None, file_size: Optional[int] = None,
+                          checksum: Optional[str] = None) -> Dikaiologitika:
     """
     Creates a new document (dikaiologitika) record in the database.
 
@@ -53,6 +40,9 @@ def create_dikaiologitika(db: Session, dikaiologitika: DikaiologitikaCreate, use
     - file_path (str): The file path where the document is stored.
     - file_name (str): The name of the file.
     - internship_program (InternshipProgram): The internship program the document is related to.
+    - blob_id (Optional[int]): The blob holding the content of the file.
+    - file_size (Optional[int]): The size of the file in bytes.
+    - checksum (Optional[str]): The SHA-256 of the file.
 
     Returns:
     - Dikaiologitika: The created document record.
@@ -71,7 +61,11 @@ def create_dikaiologitika(db: Session, dikaiologitika: DikaiologitikaCreate, use
         date=local_time,
         type=dikaiologitika.type,
         submission_time=dikaiologitika.submission_time,
-        file_name=file_name
+        file_name=file_name,
+        blob_id=blob_id,
+        file_size=file_size,
+        checksum=checksum,
+        modified_at=utc_now.replace(tzinfo=None)
     )
     db.add(db_dikaiologitika)
     db.commit()
@@ -118,6 +112,56 @@ def get_all_files(db: Session, file_type: Optional[DikaiologitikaType] = None) -
     return query.all()
 
 
+def get_cohort_files(db: Session, department: Optional[Department] = None,
+                     program: Optional[InternshipProgram] = None,
+                     internship_status: Optional[InternshipStatus] = None,
+                     submission_time: Optional[SubmissionTime] = None,
+                     file_type: Optional[DikaiologitikaType] = None) -> List:
+    """
+    Retrieves the documents of the students whose internships match the filters, for the bulk archive.
+
+    A single joined projection with the student of every document, ordered by student, so the
+    archive can be written folder by folder.
+
+    Parameters:
+    - db (Session): The database session.
+    - department (Optional[Department]): The department of the internships to filter by.
+    - program (Optional[InternshipProgram]): The program of the internships to filter by.
+    - internship_status (Optional[InternshipStatus]): The status of the internships to filter by.
+    - submission_time (Optional[SubmissionTime]): The submission time of the documents to filter by.
+    - file_type (Optional[DikaiologitikaType]): The document type to filter by.
+
+    Returns:
+    - List: The document rows with the first name, last name and AM of their student.
+    """
+    internships = select(Internship.user_id)
+    if department:
+        internships = internships.where(Internship.department == department)
+    if program:
+        internships = internships.where(Internship.program == program)
+    if internship_status:
+        internships = internships.where(Internship.status == internship_status)
+
+    query = db.query(
+        Dikaiologitika.id,
+        Dikaiologitika.user_id,
+        Dikaiologitika.file_path,
+        Dikaiologitika.file_name,
+        Dikaiologitika.type,
+        Dikaiologitika.submission_time,
+        Dikaiologitika.date,
+        Users.first_name,
+        Users.last_name,
+        Users.AM,
+    ).join(Users, Users.id == Dikaiologitika.user_id) \
+        .filter(Dikaiologitika.user_id.in_(internships))
+    if submission_time:
+        query = query.filter(Dikaiologitika.submission_time == submission_time)
+    if file_type:
+        query = query.filter(Dikaiologitika.type == file_type)
+    return query.order_by(Dikaiologitika.user_id, Dikaiologitika.id).all()
+
+
 def get_file_by_id(db: Session, file_id: int) -> Optional[Dikaiologitika]:
     """
     Retrieves a single document by its ID.
@@ -132,14 +176,23 @@ def get_file_by_id(db: Session, file_id: int) -> Optional[Dikaiologitika]:
     return db.query(Dikaiologitika).filter(Dikaiologitika.id == file_id).first()
 
 
-def update_file_path(db: Session, file_id: int, new_file_path: str, file_name: str) -> bool:
+def update_file_path(db: Session, file_id: int, new_file_path: str, file_name: str,
+                     blob_id: Optional[int] = None, file_size: Optional[int] = None,
+                     checksum: Optional[str] = None) -> bool:
     """
     Updates the file path of an existing document.
 
+    The reference to the blob of the previous file is released in the same transaction, and the
+    previous file is removed from disk after the commit once nothing references it.
+
     Parameters:
     - db (Session): The database session.
     - file_id (int): The ID of the document to update.
     - new_file_path (str): The new file path to set.
+    - file_name (str): The name of the new file.
+    - blob_id (Optional[int]): The blob holding the content of the new file, already referenced by the caller.
+    - file_size (Optional[int]): The size of the new file in bytes.
+    - checksum (Optional[str]): The SHA-256 of the new file.
 
     Returns:
     - bool: True if the update was successful, False otherwise.
@@ -150,10 +203,22 @@ def update_file_path(db: Session, file_id: int, new_file_path: str, file_name: s
     local_tz = pytz.timezone('Europe/Athens')  # For Greece
     local_time = utc_now.astimezone(local_tz)  # Convert to local timezone
     if db_file:
+        old_blob_id, old_file_path = db_file.blob_id, db_file.file_path
         db_file.file_name = file_name
         db_file.file_path = new_file_path
         db_file.date = local_time
+        db_file.blob_id = blob_id
+        db_file.file_size = file_size
+        db_file.checksum = checksum
+        db_file.modified_at = utc_now.replace(tzinfo=None)
+        # The row stops referencing the old blob before the blob can be deleted
+        db.flush()
+        removed_paths = _release_file(db, old_blob_id, old_file_path)
+        if old_blob_id is None and old_file_path == new_file_path:
+            # A file saved outside the blob store was overwritten in place
+            removed_paths = []
         db.commit()
+        file_cleanup.enqueue(removed_paths)
         return True
     return False
 
@@ -187,7 +252,7 @@ def update_file(db: Session, file_id: int, user_id: int, update_data: dict) -> O
 
 def delete_file(db: Session, file_id: int, user_id: int) -> bool:
     """
-    Deletes a document from the database.
+    Deletes a document from the database, and its file from disk once nothing references it.
 
     Parameters:
     - db (Session): The database session.
@@ -201,5 +266,15 @@ def delete_file(db: Session, file_id: int, user_id: int) -> bool:
     if db_file is None:
         return False
     db.delete(db_file)
+    db.flush()
+    removed_paths = _release_file(db, db_file.blob_id, db_file.file_path)
     db.commit()
+    file_cleanup.enqueue(removed_paths)
     return True
+
+
+def _release_file(db: Session, blob_id: Optional[int], file_path: Optional[str]) -> List[str]:
+    # Files stored before the blob store are owned by their document alone
+    if blob_id is None:
+        return [file_path]
+    return release_blobs(db, [blob_id])
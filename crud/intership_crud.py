@@ -1,19 +1,23 @@
-from typing import Optional, List, Tuple
+from collections import defaultdict
+from typing import Optional, List, Tuple, FrozenSet, Dict, Set, Iterable
 
-import requests
 from fastapi import HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Session
 from starlette import status
 
-from core.constants import INTERNSHIP_PROGRAM_REQUIREMENTS
+from core.constants import REQUIRED_FILE_TYPES
+from core.count_cache import count_total, aggregate_cache
+from core.file_cleanup import file_cleanup
 from core.messages import Messages
-from crud.company_answer_crud import delete_company_answers
+from core.pagination import paginate_query, split_page
+from core.search import contains_filter
+from crud.blob_crud import release_blobs
 from crud.company_crud import get_company
-from crud.user_answer_crud import delete_user_answers
-from crud.user_crud import get_user_by_id
 from models import Internship as InternshipModel, InternshipProgram, InternshipStatus, Users, Companies, Dikaiologitika, \
-    Department, SubmissionTime, Internship, DikaiologitikaType
-from schemas.internship_schema import InternshipCreate, InternshipAllRead
+    Department, SubmissionTime, Internship, DikaiologitikaType, UserAnswer, CompanyAnswer
+from schemas.internship_schema import InternshipCreate, InternshipAllRead, InternshipStatusUpdateResult, \
+    InternshipStatusUpdateOutcome, InternshipReadiness, InternshipSummary, InternshipCount
 
 
 def create_or_update_internship(db: Session, user_id: int, internship_data: InternshipCreate) -> InternshipModel:
@@ -132,6 +136,79 @@ def update_internship_status(db: Session, internship_id: int, internship_status:
     return internship
 
 
+def bulk_update_internship_status(db: Session, internship_ids: List[int], internship_status: InternshipStatus,
+                                  current_user_id: int,
+                                  isCurrentUserAdmin: bool) -> List[InternshipStatusUpdateResult]:
+    """
+    Update the status of several internships in one transaction.
+
+    The internships are loaded with one query and, when the new status requires submitted files
+    (the same rules as `update_internship_status`), the files of all their students are checked
+    with one grouped query. Every internship that passes its checks is updated and all of them are
+    committed together; the others are left untouched and reported.
+
+    Parameters:
+    - db (Session): Database session.
+    - internship_ids (List[int]): The IDs of the internships, duplicates are ignored.
+    - internship_status (InternshipStatus): The new status of the internships.
+    - current_user_id (int): The ID of the current user, non-admins may only update their own internships.
+    - isCurrentUserAdmin (bool): Boolean indicating if the current user is an admin.
+
+    Returns:
+    - List[InternshipStatusUpdateResult]: The result of every requested ID, in the order of the request.
+    """
+    internship_ids = list(dict.fromkeys(internship_ids))
+    internships = {internship.id: internship for internship in
+                   db.query(InternshipModel).filter(InternshipModel.id.in_(internship_ids)).all()}
+
+    # Students only have to submit their files before asking for a review
+    submission_time = None
+    if not isCurrentUserAdmin:
+        submission_time = {InternshipStatus.PENDING_REVIEW_START: SubmissionTime.START,
+                           InternshipStatus.PENDING_REVIEW_END: SubmissionTime.END}.get(internship_status)
+
+    required_files = {}
+    submitted_file_types = {}
+    if submission_time is not None and internships:
+        for program in {internship.program for internship in internships.values()}:
+            required_files[program] = get_required_files(program, submission_time)
+        submitted_file_types = get_submitted_file_types(
+            db, {internship.user_id for internship in internships.values()}, frozenset().union(*required_files.values()))
+
+    results = []
+    for internship_id in internship_ids:
+        internship = internships.get(internship_id)
+        if internship is None:
+            results.append(InternshipStatusUpdateResult(id=internship_id,
+                                                        outcome=InternshipStatusUpdateOutcome.NOT_FOUND,
+                                                        detail=Messages.INTERNSHIP_NOT_FOUND))
+            continue
+        if not isCurrentUserAdmin and internship.user_id != current_user_id:
+            results.append(InternshipStatusUpdateResult(id=internship_id,
+                                                        outcome=InternshipStatusUpdateOutcome.FORBIDDEN,
+                                                        detail=Messages.UNAUTHORIZED_USER))
+            continue
+        if submission_time is not None:
+            required = required_files[internship.program]
+            submitted_files_count = len(required & submitted_file_types.get(internship.user_id, set()))
+            if submitted_files_count < len(required):
+                results.append(InternshipStatusUpdateResult(
+                    id=internship_id,
+                    outcome=InternshipStatusUpdateOutcome.MISSING_FILES,
+                    detail=Messages.REQUIRED_FILES_MISSING.format(submitted=submitted_files_count,
+                                                                  required=len(required))))
+                continue
+        if internship.status == internship_status:
+            results.append(InternshipStatusUpdateResult(id=internship_id,
+                                                        outcome=InternshipStatusUpdateOutcome.UNCHANGED))
+            continue
+        internship.status = internship_status
+        results.append(InternshipStatusUpdateResult(id=internship_id, outcome=InternshipStatusUpdateOutcome.UPDATED))
+
+    db.commit()
+    return results
+
+
 def get_user_internship(db: Session, user_id: int) -> Optional[InternshipModel]:
     """
     Get the internship associated with a user.
@@ -171,39 +248,61 @@ def delete_internship(db: Session, internship_id: int) -> bool:
     Returns:
     - bool: True if the internship was deleted, False otherwise.
     """
-    internship = get_internship_by_id(db, internship_id)
-    if internship:
-        # Delete all associated files
-        files = db.query(Dikaiologitika).filter(Dikaiologitika.user_id == internship.user_id).all()
-        for file in files:
-            db.delete(file)
-        # delete user answers for internship
-        delete_user_answers(db, internship.user_id)
-        # delete company answers for internship
-        delete_company_answers(db, internship.id)
-
-        # Delete the internship
-        db.delete(internship)
-        db.commit()
-        return True
-    return False
+    return bool(delete_internships(db, [internship_id]))
 
 
-def get_all_internships(
+def delete_internships(db: Session, internship_ids: List[int]) -> List[int]:
+    """
+    Delete internships along with the files and questionnaire answers of their students.
+
+    Every table is cleared with one set-based DELETE and everything is committed in one
+    transaction. The files no longer referenced are removed from disk by the cleanup queue once
+    the commit succeeded.
+
+    Parameters:
+    - db (Session): Database session.
+    - internship_ids (List[int]): The IDs of the internships to delete.
+
+    Returns:
+    - List[int]: The IDs of the internships that were found and deleted.
+    """
+    internships = db.query(InternshipModel.id, InternshipModel.user_id).filter(
+        InternshipModel.id.in_(internship_ids)).all()
+    if not internships:
+        return []
+    deleted_ids = [internship.id for internship in internships]
+    user_ids = {internship.user_id for internship in internships}
+
+    files = db.query(Dikaiologitika.file_path, Dikaiologitika.blob_id).filter(
+        Dikaiologitika.user_id.in_(user_ids)).all()
+    # No deleted row is loaded in the session, so it does not have to be synchronized
+    db.query(Dikaiologitika).filter(Dikaiologitika.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(UserAnswer).filter(UserAnswer.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(CompanyAnswer).filter(CompanyAnswer.internship_id.in_(deleted_ids)).delete(synchronize_session=False)
+    db.query(InternshipModel).filter(InternshipModel.id.in_(deleted_ids)).delete(synchronize_session=False)
+    # Files stored before the blob store are owned by their document alone, blobs may be shared
+    removed_paths = [file.file_path for file in files if file.blob_id is None]
+    removed_paths += release_blobs(db, [file.blob_id for file in files if file.blob_id is not None])
+    db.commit()
+
+    file_cleanup.enqueue(removed_paths)
+    return deleted_ids
+
+
+def query_internships(
         db: Session,
         internship_status: Optional[InternshipStatus] = None,
         program: Optional[InternshipProgram] = None,
         department: Optional[Department] = None,
         user_am: Optional[str] = None,
         company_name: Optional[str] = None,
-        send_by_secretary: bool = False,
-        page: int = 1,
-        items_per_page: int = 10
-) -> Tuple[List[InternshipAllRead], int]:
+        send_by_secretary: bool = False
+):
     """
-    Get all internships with optional filtering by status, program, department, user academic number,
-    and company name, with pagination. If `send_by_secretary` is True, the internships are filtered
-    based on whether the user has uploaded a document of type 'AitisiPraktikis'.
+    Build the filtered internship listing query, shared by the paginated listing and the bulk export.
+
+    The query is a single joined projection with only the columns InternshipAllRead needs, instead of
+    loading the user and the company of every internship separately.
 
     Parameters:
     - db (Session): Database session.
@@ -213,17 +312,31 @@ def get_all_internships(
     - user_am (Optional[str]): The academic number to filter by.
     - company_name (Optional[str]): The company name to filter by.
     - send_by_secretary (bool): If true, filters internships where 'AitisiPraktikis' is found.
-    - page (int): The page number for pagination.
-    - items_per_page (int): The number of items per page.
 
     Returns:
-    - Tuple[List[InternshipAllRead], int]: A list of internships with detailed information and the total count.
+    - Query: The unordered query of the internship rows.
     """
-    query = db.query(InternshipModel)
+    query = db.query(
+        InternshipModel.id,
+        InternshipModel.user_id,
+        InternshipModel.department,
+        InternshipModel.program,
+        InternshipModel.start_date,
+        InternshipModel.end_date,
+        InternshipModel.status,
+        InternshipModel.supervisor,
+        Users.first_name.label('user_first_name'),
+        Users.last_name.label('user_last_name'),
+        Users.AM.label('user_am'),
+        Companies.name.label('company_name'),
+        Companies.id.label('company_id'),
+    ).outerjoin(Users, Users.id == InternshipModel.user_id) \
+        .outerjoin(Companies, Companies.id == InternshipModel.company_id)
     if send_by_secretary:
-        query = query.join(Dikaiologitika, Dikaiologitika.user_id == InternshipModel.user_id).filter(
+        query = query.filter(exists().where(
+            Dikaiologitika.user_id == InternshipModel.user_id,
             Dikaiologitika.type == DikaiologitikaType.AitisiPraktikis
-        )
+        ))
 
     if department:
         query = query.filter(InternshipModel.department == department)
@@ -232,45 +345,118 @@ def get_all_internships(
     if program:
         query = query.filter(InternshipModel.program == program)
     if user_am:
-        query = query.join(Users).filter(Users.AM.ilike(f"%{user_am}%"))
+        query = query.filter(Users.AM.ilike(f"%{user_am}%"))
     if company_name:
-        query = query.join(Companies).filter(Companies.name.ilike(f"%{company_name}%"))
+        query = query.filter(contains_filter(Companies.search_text, company_name))
+    return query
 
-    total_items = query.count()
-    offset = (page - 1) * items_per_page
 
-    if items_per_page == -1:
-        internships = query.offset(offset).all()
-    else:
-        internships = query.offset(offset).limit(items_per_page).all()
+def get_all_internships(
+        db: Session,
+        internship_status: Optional[InternshipStatus] = None,
+        program: Optional[InternshipProgram] = None,
+        department: Optional[Department] = None,
+        user_am: Optional[str] = None,
+        company_name: Optional[str] = None,
+        send_by_secretary: bool = False,
+        page: int = 1,
+        items_per_page: int = 10,
+        after: Optional[str] = None,
+        approximate_count: bool = False
+) -> Tuple[List[InternshipAllRead], int, Optional[str]]:
+    """
+    Get all internships with optional filtering by status, program, department, user academic number,
+    and company name, with pagination. If `send_by_secretary` is True, the internships are filtered
+    based on whether the user has uploaded a document of type 'AitisiPraktikis'.
 
-    internship_reads = []
-    for internship in internships:
-        user = get_user_by_id(db, internship.user_id)
-        company = get_company(db, internship.company_id)
-        internship_reads.append(
-            InternshipAllRead(
-                id=internship.id,
-                user_id=internship.user_id,
-                department=internship.department,
-                program=internship.program,
-                start_date=internship.start_date,
-                end_date=internship.end_date,
-                status=internship.status,
-                supervisor=internship.supervisor,
-                user_first_name=user.first_name if user else "",
-                user_last_name=user.last_name if user else "",
-                user_am=user.AM if user else "",
-                company_name=company.name if company else None,
-                company_id=company.id if company else None,
-                sendBySecretary=send_by_secretary
-            )
+    Parameters:
+    - db (Session): Database session.
+    - internship_status (Optional[InternshipStatus]): The status to filter by.
+    - program (Optional[InternshipProgram]): The program to filter by.
+    - department (Optional[Department]): The department to filter by.
+    - user_am (Optional[str]): The academic number to filter by.
+    - company_name (Optional[str]): The company name to filter by.
+    - send_by_secretary (bool): If true, filters internships where 'AitisiPraktikis' is found.
+    - page (int): The page number for pagination.
+    - items_per_page (int): The number of items per page.
+    - after (Optional[str]): Cursor of the previous page, used instead of `page` when given.
+    - approximate_count (bool): Use the planner estimate as total when no filter is given.
+
+    Returns:
+    - Tuple[List[InternshipAllRead], int, Optional[str]]: A list of internships with detailed information, the total
+      count and the cursor of the next page (None on the last page).
+    """
+    query = query_internships(db, internship_status, program, department, user_am, company_name, send_by_secretary)
+
+    is_filtered = any([send_by_secretary, department, internship_status, program, user_am, company_name])
+    total_items = count_total(db, query, InternshipModel.__table__, approximate=approximate_count and not is_filtered)
+
+    rows = paginate_query(query, InternshipModel.id, page, items_per_page, after).all()
+    rows, next_cursor = split_page(rows, InternshipModel.id, items_per_page)
+
+    internship_reads = [
+        InternshipAllRead(
+            id=row.id,
+            user_id=row.user_id,
+            department=row.department,
+            program=row.program,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            status=row.status,
+            supervisor=row.supervisor,
+            user_first_name=row.user_first_name or "",
+            user_last_name=row.user_last_name or "",
+            user_am=row.user_am or "",
+            company_name=row.company_name,
+            company_id=row.company_id,
+            sendBySecretary=send_by_secretary
         )
+        for row in rows
+    ]
 
-    return internship_reads, total_items
+    return internship_reads, total_items, next_cursor
 
 
-def get_required_files(program: InternshipProgram, submission_time: SubmissionTime) -> List[str]:
+def get_internship_summary(db: Session) -> InternshipSummary:
+    """
+    Count the internships per status, department and program for the admin dashboard.
+
+    All the counts come from one GROUP BY query, cached in the worker process until a write to the
+    internships table (any create, update or delete of this module) is committed.
+
+    Parameters:
+    - db (Session): Database session.
+
+    Returns:
+    - InternshipSummary: The total, the count per status, department and program, and every combination.
+    """
+    return aggregate_cache.get('internship_summary', [InternshipModel.__tablename__],
+                               lambda: _count_internships(db))
+
+
+def _count_internships(db: Session) -> InternshipSummary:
+    rows = db.query(
+        InternshipModel.status,
+        InternshipModel.department,
+        InternshipModel.program,
+        func.count(InternshipModel.id)
+    ).group_by(InternshipModel.status, InternshipModel.department, InternshipModel.program).all()
+
+    by_status = dict.fromkeys(InternshipStatus, 0)
+    by_department = dict.fromkeys(Department, 0)
+    by_program = dict.fromkeys(InternshipProgram, 0)
+    counts = []
+    for internship_status, department, program, count in rows:
+        by_status[internship_status] += count
+        by_department[department] += count
+        by_program[program] += count
+        counts.append(InternshipCount(status=internship_status, department=department, program=program,
+                                      count=count))
+    return InternshipSummary(total=sum(by_status.values()), by_status=by_status, by_department=by_department,
+                             by_program=by_program, counts=counts)
+
+
+def get_required_files(program: InternshipProgram, submission_time: SubmissionTime) -> FrozenSet[str]:
     """
     Get the required files for a given internship program and submission time.
 
@@ -279,12 +465,34 @@ def get_required_files(program: InternshipProgram, submission_time: SubmissionTi
     - submission_time (SubmissionTime): The submission time (START or END).
 
     Returns:
-    - List[str]: A list of required file types.
+    - FrozenSet[str]: The required file types, precomputed at import.
+    """
+    return REQUIRED_FILE_TYPES.get((program, submission_time), frozenset())
+
+
+def get_submitted_file_types(db: Session, user_ids, file_types: Iterable[str]) -> Dict[int, Set[str]]:
+    """
+    Get the submitted file types of many users with one grouped query.
+
+    Parameters:
+    - db (Session): Database session.
+    - user_ids: The IDs of the users, a collection or a subquery selecting them.
+    - file_types (Iterable[str]): Only these file types are considered.
+
+    Returns:
+    - Dict[int, Set[str]]: The submitted file types of every user that submitted at least one of them.
     """
-    # Retrieve the requirements based on the internship program
-    requirements = INTERNSHIP_PROGRAM_REQUIREMENTS.get(program, [])
-    # Filter the requirements based on the submission time (START or END)
-    return [req['type'] for req in requirements if req['submission_time'] == submission_time.value]
+    file_types = set(file_types)
+    submitted_file_types = defaultdict(set)
+    if not file_types:
+        return submitted_file_types
+    rows = db.query(Dikaiologitika.user_id, Dikaiologitika.type).filter(
+        Dikaiologitika.user_id.in_(user_ids),
+        Dikaiologitika.type.in_(file_types)
+    ).group_by(Dikaiologitika.user_id, Dikaiologitika.type).all()
+    for user_id, file_type in rows:
+        submitted_file_types[user_id].add(file_type.value)
+    return submitted_file_types
 
 
 def check_required_files_submitted(db: Session, user_id: int, program: InternshipProgram,
@@ -306,14 +514,8 @@ def check_required_files_submitted(db: Session, user_id: int, program: Internshi
     required_files = get_required_files(program, submission_time)
     total_required_files = len(required_files)
 
-    # Query the submitted files from the database
-    submitted_files = db.query(Dikaiologitika).filter(
-        Dikaiologitika.user_id == user_id,
-        Dikaiologitika.type.in_(required_files)
-    ).all()
-
-    # Determine the types of files that have been submitted
-    submitted_file_types = {file.type for file in submitted_files}
+    # Query the types of the submitted files from the database
+    submitted_file_types = get_submitted_file_types(db, [user_id], required_files).get(user_id, set())
     submitted_files_count = len(submitted_file_types)
 
     # Check if all required files are submitted
@@ -321,21 +523,102 @@ def check_required_files_submitted(db: Session, user_id: int, program: Internshi
     return all_submitted, submitted_files_count, total_required_files
 
 
+def get_internships_readiness(
+        db: Session,
+        submission_time: SubmissionTime,
+        internship_status: Optional[InternshipStatus] = None,
+        program: Optional[InternshipProgram] = None,
+        department: Optional[Department] = None,
+        user_am: Optional[str] = None,
+        ready: Optional[bool] = None
+) -> List[InternshipReadiness]:
+    """
+    Report the submitted and missing required files of every internship matching the filters.
+
+    The internships are listed with one query and the files of all their students are counted
+    with one grouped query, instead of one `check_required_files_submitted` call per internship.
+
+    Parameters:
+    - db (Session): Database session.
+    - submission_time (SubmissionTime): The review the files are required for (START or END).
+    - internship_status (Optional[InternshipStatus]): The status to filter by.
+    - program (Optional[InternshipProgram]): The program to filter by.
+    - department (Optional[Department]): The department to filter by.
+    - user_am (Optional[str]): The academic number to filter by.
+    - ready (Optional[bool]): If given, only the internships that are (or are not) ready.
+
+    Returns:
+    - List[InternshipReadiness]: The readiness of the internships, ordered by ID.
+    """
+    query = query_internships(db, internship_status=internship_status, program=program, department=department,
+                              user_am=user_am)
+    internships = query.order_by(InternshipModel.id).all()
+    if not internships:
+        return []
+
+    programs = {internship.program for internship in internships}
+    submitted_file_types = get_submitted_file_types(
+        db, query.with_entities(InternshipModel.user_id).statement,
+        frozenset().union(*(get_required_files(program, submission_time) for program in programs)))
+
+    readiness = []
+    for internship in internships:
+        required = get_required_files(internship.program, submission_time)
+        missing = required - submitted_file_types.get(internship.user_id, set())
+        if ready is not None and ready != (not missing):
+            continue
+        readiness.append(InternshipReadiness(
+            id=internship.id,
+            user_id=internship.user_id,
+            user_first_name=internship.user_first_name or "",
+            user_last_name=internship.user_last_name or "",
+            user_am=internship.user_am or "",
+            program=internship.program,
+            department=internship.department,
+            status=internship.status,
+            submitted_files_count=len(required) - len(missing),
+            required_files_count=len(required),
+            missing_file_types=sorted(missing),
+            ready=not missing
+        ))
+    return readiness
+
+
 def fetch_active_internships_with_details(db: Session, program: Optional[InternshipProgram],
-                                          department: Optional[Department]):
+                                          department: Optional[Department], chunk_size: int = 500):
     """
     Fetch active internships with all related user and company details.
 
+    Only the exported columns are selected, and the rows are fetched from the database in chunks of
+    `chunk_size` (server-side cursor on Postgres) while they are iterated, so the whole result is never
+    held in memory.
+
     Parameters:
     - db (Session): Database session.
     - program (Optional[InternshipProgram]): Filter by specific internship program.
     - department (Optional[Department]): Filter by department.
+    - chunk_size (int): Number of rows fetched at a time.
 
     Returns:
-    - List of internships with detailed data.
+    - Query: An iterable of rows with the internship, user and company details.
     """
-    query = db.query(Internship) \
-        .options(joinedload(Internship.user), joinedload(Internship.company)) \
+    query = db.query(
+        Users.first_name,
+        Users.last_name,
+        Users.AM,
+        Users.email,
+        Users.telephone_number,
+        Internship.start_date,
+        Internship.end_date,
+        Internship.supervisor,
+        Companies.name.label('company_name'),
+        Companies.AFM.label('company_AFM'),
+        Companies.email.label('company_email'),
+        Companies.telephone.label('company_telephone'),
+        Companies.city.label('company_city'),
+    ).select_from(Internship) \
+        .outerjoin(Users, Users.id == Internship.user_id) \
+        .outerjoin(Companies, Companies.id == Internship.company_id) \
         .filter(Internship.status == InternshipStatus.ACTIVE)
 
     if program:
@@ -343,15 +626,4 @@ def fetch_active_internships_with_details(db: Session, program: Optional[Interns
     if department:
         query = query.filter(Internship.department == department)
 
-    return query.all()
-
-
-def fetch_supervisors():
-    url = 'https://aboard.iee.ihu.gr/api/v2/authors'
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        supervisors = response.json()
-        return [supervisor['name'] for supervisor in supervisors]
-    except requests.RequestException as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return query.order_by(Internship.id).yield_per(chunk_size)
@@ -1,7 +1,8 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List
 
 from sqlalchemy.orm import Session
 
+from core.search import search_query
 from models import Users, UserRole, Department
 
 
@@ -33,6 +34,44 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[Users]:
     return db.query(Users).filter(Users.id == user_id).first()
 
 
+def filter_users(query, am: Optional[str] = None, role: Optional[UserRole] = None,
+                 department: Optional[Department] = None):
+    """
+    Apply the user listing filters to a query of users (or of user columns).
+
+    Parameters:
+    - query (Query): The query to filter.
+    - am (Optional[str]): Filter by part of the Academic Number.
+    - role (Optional[UserRole]): Filter by role.
+    - department (Optional[Department]): Filter by department.
+
+    Returns:
+    - Query: The filtered query.
+    """
+    if am:
+        query = query.filter(Users.AM.ilike(f"%{am}%"))
+    if role:
+        query = query.filter(Users.role == role)
+    if department:
+        query = query.filter(Users.department == department)
+    return query
+
+
+def search_users(db: Session, term: str, limit: int) -> List[Users]:
+    """
+    Search users by AM, first or last name, ignoring accents and case.
+
+    Parameters:
+    - db (Session): The database session.
+    - term (str): The search term, matched anywhere in the AM or the names.
+    - limit (int): The maximum number of users to return.
+
+    Returns:
+    - List[Users]: The matching users, best matches first.
+    """
+    return search_query(db, db.query(Users), Users.search_text, term, limit)
+
+
 def create_user(db: Session, user: dict) -> Users:
     """
     Create a new user in the database.
@@ -1,13 +1,120 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+from time import monotonic
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from core.config import settings
+from core.db_metrics import PoolMetrics
+
+logger = logging.getLogger(__name__)
+
+def get_pool_options(database_url: str) -> dict:
+    """
+    Build the connection pool keyword arguments from the settings.
+
+    Sizing options are only passed to queue-based pools, since dialects that default to
+    another pool (e.g. in-memory SQLite with SingletonThreadPool) reject them.
+
+    Parameters:
+    - database_url (str): The database URL the engine is created for.
+
+    Returns:
+    - dict: Keyword arguments for `create_engine`.
+    """
+    options = {
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+    url = make_url(database_url)
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+    return options
+
+
+class ReplicaMonitor:
+    """
+    Tracks whether the read replica is reachable and within the allowed replication lag.
+
+    The result of a check is cached for `check_interval` seconds so the health query does
+    not run on every request.
+    """
+    # Replication lag in seconds, 0 when the replica has replayed everything it received
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+    def __init__(self, replica_engine: Engine, max_lag: int, check_interval: int):
+        self.engine = replica_engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._available = True
+        self._checked_at = None
+
+    def is_available(self) -> bool:
+        """
+        Return whether reads can be sent to the replica, re-checking when the cached result is stale.
+        """
+        with self._lock:
+            if self._checked_at is not None and monotonic() - self._checked_at < self.check_interval:
+                return self._available
+            self._checked_at = monotonic()
+        available = self._check()
+        with self._lock:
+            self._available = available
+        return available
+
+    def mark_unavailable(self):
+        """
+        Mark the replica as down until the next health check is due.
+        """
+        with self._lock:
+            self._available = False
+            self._checked_at = monotonic()
+
+    def _check(self) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                if self.engine.dialect.name != 'postgresql':
+                    connection.execute(text("SELECT 1"))
+                    return True
+                lag = connection.scalar(self.LAG_QUERY)
+        except SQLAlchemyError as e:
+            logger.warning(f"Read replica unavailable, falling back to the primary: {e}")
+            return False
+        if lag is not None and lag > self.max_lag:
+            logger.warning(f"Read replica lagging by {lag:.1f}s, falling back to the primary")
+            return False
+        return True
+
 
 # use for sqlite
 # engine = create_engine(settings.DATABASE_URL, connect_args={'check_same_thread': False})
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **get_pool_options(settings.DATABASE_URL))
+pool_metrics = PoolMetrics(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The read replica is optional, without it read-only routes use the primary
+replica_engine = None
+ReplicaSessionLocal = None
+replica_monitor = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL, **get_pool_options(settings.DATABASE_REPLICA_URL))
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    replica_monitor = ReplicaMonitor(replica_engine, settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+                                     settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS)
+
 Base = declarative_base()
@@ -1,25 +1,74 @@
+from contextlib import contextmanager
+
 from fastapi import Depends, HTTPException, Cookie
 from jose import JWTError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from starlette import status
 
 from core.auth import verify_jwt
 from core.messages import Messages
 from crud.user_crud import get_user_by_id
-from database import SessionLocal
+from database import SessionLocal, pool_metrics, ReplicaSessionLocal, replica_monitor
 
 
 # Dependency to get a database session
 def get_db():
     db = SessionLocal()
     try:
+        # Check out the connection up front so the pool wait time is measured
+        with pool_metrics.measure_checkout():
+            db.connection()
         yield db
     finally:
         db.close()
 
 
-# Dependency to get the current user
-def get_current_user(db: Session = Depends(get_db), placements_access_token: str = Cookie(None)):
+@contextmanager
+def read_session(primary: bool = False):
+    """
+    Open a read-only database session, served by the replica when it is healthy.
+
+    Used directly by streaming responses, which outlive the request dependencies.
+
+    Parameters:
+    - primary (bool): Read from the primary even when the replica is healthy, for reads that must not lag.
+    """
+    db = None
+    if not primary and ReplicaSessionLocal is not None and replica_monitor.is_available():
+        db = ReplicaSessionLocal()
+        try:
+            db.connection()
+        except SQLAlchemyError:
+            db.close()
+            db = None
+            replica_monitor.mark_unavailable()
+    if db is None:
+        db = SessionLocal()
+        with pool_metrics.measure_checkout():
+            db.connection()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency to get a read-only database session, served by the replica when it is healthy
+def get_read_db():
+    with read_session() as db:
+        yield db
+
+
+def get_user_id_from_token(placements_access_token: str) -> int:
+    """
+    Validate the access token cookie and extract the user ID from it.
+
+    Parameters:
+    - placements_access_token (str): The JWT access token from the request cookie.
+
+    Returns:
+    - int: The ID of the user the token was issued for.
+    """
     try:
         # Check if the token is present
         if placements_access_token is None:
@@ -33,12 +82,18 @@ def get_current_user(db: Session = Depends(get_db), placements_access_token: str
         user_id: int = int(payload.get("sub"))
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_TOKEN)
-
-        # Fetch the user from the database using the user ID
-        user = get_user_by_id(db, user_id)
-        if user is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.USER_NOT_FOUND)
-
-        return user
+        return user_id
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=Messages.INVALID_TOKEN)
+
+
+# Dependency to get the current user
+def get_current_user(db: Session = Depends(get_db), placements_access_token: str = Cookie(None)):
+    user_id = get_user_id_from_token(placements_access_token)
+
+    # Fetch the user from the database using the user ID
+    user = get_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.USER_NOT_FOUND)
+
+    return user
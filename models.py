@@ -1,9 +1,11 @@
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
-from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean, Index, event
+from sqlalchemy import Enum as SQLAlchemyEnum, text
 from sqlalchemy.orm import relationship
 
+from core.search import build_search_text
 from database import Base
 
 
@@ -103,6 +105,13 @@ class QuestionType(str, Enum):
 # Define the Users table
 class Users(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Trigram indexes for substring / similarity search (Postgres with pg_trgm)
+        Index('ix_users_search_text_trgm', 'search_text', postgresql_using='gin',
+              postgresql_ops={'search_text': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_users_am_trgm', 'AM', postgresql_using='gin',
+              postgresql_ops={'AM': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String)
@@ -113,6 +122,10 @@ class Users(Base):
     AM = Column(String, unique=True, nullable=True)
     department = Column(SQLAlchemyEnum(Department), nullable=True)
     role = Column(SQLAlchemyEnum(UserRole), default=UserRole.STUDENT)
+    # Normalized AM, first and last name, maintained on insert / update
+    search_text = Column(String, nullable=True)
+    # Time of the last insert / update (UTC), part of the data version of the cached exports
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Define relationships
     dikaiologitika = relationship("Dikaiologitika", back_populates="user", cascade="all, delete-orphan")
@@ -126,8 +139,8 @@ class OTP(Base):
     __tablename__ = 'otps'
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    otp = Column(String(6), nullable=False)
-    expiry = Column(DateTime, nullable=False)
+    otp = Column(String(6), nullable=False, index=True)
+    expiry = Column(DateTime, nullable=False, index=True)
 
     # Define relationships
     user = relationship("Users", back_populates="otps")
@@ -136,6 +149,10 @@ class OTP(Base):
 # Define the Companies table
 class Companies(Base):
     __tablename__ = 'companies'
+    __table_args__ = (
+        Index('ix_companies_search_text_trgm', 'search_text', postgresql_using='gin',
+              postgresql_ops={'search_text': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -143,6 +160,10 @@ class Companies(Base):
     email = Column(String, nullable=False)
     telephone = Column(String, nullable=False)
     city = Column(String, nullable=False)
+    # Normalized company name, maintained on insert / update
+    search_text = Column(String, nullable=True)
+    # Time of the last insert / update (UTC), part of the data version of the cached exports
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Define relationships
     internships = relationship("Internship", back_populates="company")
@@ -151,9 +172,16 @@ class Companies(Base):
 # Define the Internship table
 class Internship(Base):
     __tablename__ = 'internships'
+    __table_args__ = (
+        # Admin listing / export filters
+        Index('ix_internships_status_department_program', 'status', 'department', 'program'),
+        # Export of active internships
+        Index('ix_internships_active_department_program', 'department', 'program',
+              postgresql_where=text("status = 'ACTIVE'"), sqlite_where=text("status = 'ACTIVE'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     company_id = Column(Integer, ForeignKey('companies.id'), nullable=True)
     department = Column(SQLAlchemyEnum(Department), nullable=False)
     program = Column(SQLAlchemyEnum(InternshipProgram), nullable=False)
@@ -162,15 +190,36 @@ class Internship(Base):
     status = Column(SQLAlchemyEnum(InternshipStatus),
                     default=InternshipStatus.SUBMIT_STAT_FILES_WITHOUT_SECRETARY_CERTIFICATION, nullable=False)
     supervisor = Column(String, nullable=True)
+    # Time of the last insert / update (UTC), part of the data version of the cached exports
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
     # Define relationships
     user = relationship("Users", back_populates='internships')
     company = relationship("Companies", back_populates="internships")
     company_answers = relationship("CompanyAnswer", back_populates="internship")
 
 
+# Define the Blob table, one stored copy per distinct file content
+class Blob(Base):
+    __tablename__ = 'blobs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    size = Column(Integer, nullable=False)
+    path = Column(String, nullable=False)
+    # Number of dikaiologitika pointing at the blob, the file is removed when it drops to zero
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+
+    # Define relationships
+    dikaiologitika = relationship("Dikaiologitika", back_populates="blob")
+
+
 # Define the Dikaiologitika table
 class Dikaiologitika(Base):
     __tablename__ = 'dikaiologitika'
+    __table_args__ = (
+        Index('ix_dikaiologitika_user_id_type', 'user_id', 'type'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -179,9 +228,16 @@ class Dikaiologitika(Base):
     type = Column(SQLAlchemyEnum(DikaiologitikaType))
     submission_time = Column(SQLAlchemyEnum(SubmissionTime))
     file_name = Column(String)
+    # Stored content of the file, null for files uploaded before the blob store
+    blob_id = Column(Integer, ForeignKey('blobs.id'), nullable=True, index=True)
+    # Validators of the download (ETag / Last-Modified), null for files uploaded before they were stored
+    file_size = Column(Integer, nullable=True)
+    checksum = Column(String(64), nullable=True)
+    modified_at = Column(DateTime, nullable=True)  # UTC
 
     # Define relationships
     user = relationship("Users", back_populates='dikaiologitika')
+    blob = relationship("Blob", back_populates="dikaiologitika")
 
 
 # Define the Question table
@@ -220,6 +276,9 @@ class AnswerOption(Base):
 # Define the UserAnswer table
 class UserAnswer(Base):
     __tablename__ = 'user_answers'
+    __table_args__ = (
+        Index('ix_user_answers_user_id_question_id', 'user_id', 'question_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -235,6 +294,9 @@ class UserAnswer(Base):
 
 class CompanyAnswer(Base):
     __tablename__ = 'company_answers'
+    __table_args__ = (
+        Index('ix_company_answers_internship_id_question_id', 'internship_id', 'question_id'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     internship_id = Column(Integer, ForeignKey('internships.id'), nullable=False)
     question_id = Column(Integer, ForeignKey('questions.id'), nullable=False)
@@ -244,3 +306,16 @@ class CompanyAnswer(Base):
     internship = relationship("Internship", back_populates="company_answers")
     question = relationship("Question", back_populates="company_answers")
     answer_option = relationship("AnswerOption", back_populates="company_answers")
+
+
+# Keep the normalized search columns in sync with the searchable fields
+@event.listens_for(Users, 'before_insert')
+@event.listens_for(Users, 'before_update')
+def set_user_search_text(mapper, connection, target):
+    target.search_text = build_search_text(target.AM, target.first_name, target.last_name)
+
+
+@event.listens_for(Companies, 'before_insert')
+@event.listens_for(Companies, 'before_update')
+def set_company_search_text(mapper, connection, target):
+    target.search_text = build_search_text(target.name)
@@ -7,6 +7,12 @@ from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 import models
 from core.config import settings
+from core.db_metrics import QueryStatsMiddleware
+from core.export_jobs import export_jobs
+from core.file_cleanup import file_cleanup
+from core.migrations import check_database_revision
+from core.storage import storage
+from core.supervisors import supervisor_directory
 from crud.otp_crud import cleanup_expired_otps
 from database import engine, SessionLocal
 from routers.announcements import router as announcement_router
@@ -14,6 +20,7 @@ from routers.auth import router as auth_router
 from routers.companies import router as companies_router
 from routers.company_answers import router as company_answers_router
 from routers.dikaiologitika import router as dikaiologitika_router
+from routers.internal import router as internal_router
 from routers.internship import router as internship_router
 from routers.otp import router as otp_router
 from routers.questions import router as question_router
@@ -33,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["Content-Type", "Accept", 'token'],
+    expose_headers=["X-DB-Queries", "X-DB-Time"],
 )
 
 app.add_middleware(
@@ -48,6 +56,14 @@ app.add_middleware(
     TrustedHostMiddleware, allowed_hosts=settings.TRUSTED_HOSTS
 )
 
+if settings.DB_QUERY_METRICS:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        max_queries=settings.DB_SLOW_REQUEST_QUERIES,
+        max_time_ms=settings.DB_SLOW_REQUEST_MS,
+        repeated_statement_threshold=settings.DB_REPEATED_STATEMENT_THRESHOLD,
+    )
+
 
 async def schedule_cleanup_otp(interval: int):
     while True:
@@ -61,10 +77,22 @@ async def schedule_cleanup_otp(interval: int):
 
 @app.on_event("startup")
 async def startup_event():
+    if settings.DATABASE_CREATE_ALL:
+        models.Base.metadata.create_all(bind=engine)
+    elif settings.DATABASE_CHECK_REVISION:
+        check_database_revision(engine)
     loop = asyncio.get_event_loop()
     loop.create_task(schedule_cleanup_otp(3600))  # 1 Hour
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    export_jobs.shutdown()
+    file_cleanup.shutdown()
+    storage.close()
+    await supervisor_directory.close()
+
+
 app.include_router(users_router)
 app.include_router(dikaiologitika_router)
 app.include_router(question_router)
@@ -75,5 +103,4 @@ app.include_router(internship_router)
 app.include_router(otp_router)
 app.include_router(company_answers_router)
 app.include_router(announcement_router)
-
-models.Base.metadata.create_all(bind=engine)
+app.include_router(internal_router)
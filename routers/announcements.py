@@ -1,6 +1,5 @@
 from typing import Optional
 
-import httpx
 from fastapi import APIRouter, HTTPException, Query
 
 router = APIRouter(
@@ -33,6 +32,9 @@ async def fetch_announcements(
     Returns:
     - JSON response from the announcements API
     """
+    # Only loaded when the announcements are fetched
+    import httpx
+
     try:
         url = httpx.URL(API_URL)
         params = {
@@ -3,12 +3,12 @@ import urllib
 from datetime import timedelta, datetime, timezone
 from typing import Optional, Dict, Union
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Cookie, Response
 from fastapi.responses import RedirectResponse
 from jose import jwt
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
 from core.auth import create_access_token
@@ -104,7 +104,8 @@ async def authenticate_login(request: Request, response: Response, db: Session =
     else:
         am = profile_data.get('am')
         department = determine_department(am)
-    db_user = get_user_by_AM(db, am)
+    # The handler awaits the identity provider, so its blocking queries run in the threadpool
+    db_user = await run_in_threadpool(get_user_by_AM, db, am)
     if db_user:
         # Determine if the user is an admin
         admin_status = is_admin(db_user)
@@ -153,7 +154,7 @@ async def authenticate_login(request: Request, response: Response, db: Session =
             'email': profile_data.get('mail')
         }
         # Create new user in the database
-        new_user = create_user(db=db, user=new_user_data)
+        new_user = await run_in_threadpool(create_user, db=db, user=new_user_data)
         # Determine if the new user is an admin and generate a new access token
         admin_status = is_admin(new_user)
         # Determine if the user is a secretary
@@ -262,6 +263,9 @@ async def fetch_token(code: str) -> Optional[Dict[str, str]]:
     client_secret = settings.CLIENT_SECRET
     grant_type = 'authorization_code'
 
+    # Only loaded when a user logs in
+    import httpx
+
     body = {
         "client_id": client_id,
         "client_secret": client_secret,
@@ -298,6 +302,8 @@ async def fetch_profile(token_data: dict) -> Optional[Dict[str, Union[str, int]]
     profile_endpoint = "https://api.iee.ihu.gr/profile"
     headers = {"x-access-token": access_token}
 
+    import httpx
+
     try:
         async with httpx.AsyncClient() as client:
             response = await client.get(profile_endpoint, headers=headers)
@@ -3,13 +3,18 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.responses import StreamingResponse
 
 from core.messages import Messages
-from crud.company_crud import create_company, update_company, delete_company, get_all_companies, get_company_by_AFM
+from core.search import SEARCH_MAX_LIMIT
+from core.streaming_export import stream_rows, EXPORT_MEDIA_TYPES, EXPORT_CHUNK_SIZE
+from crud.company_crud import create_company, update_company, delete_company, get_all_companies, get_company_by_AFM, \
+    search_companies, filter_companies
 from crud.user_crud import is_admin
-from dependencies import get_db, get_current_user
-from models import Users
+from dependencies import get_db, get_current_user, get_read_db, read_session
+from models import Users, Companies
 from schemas.company_schema import CompanyBase, Company
+from schemas.export_schema import ExportFormat
 from schemas.response import ResponseWrapper, Message, ResponseTotalItems
 
 router = APIRouter(
@@ -17,13 +22,19 @@ router = APIRouter(
     tags=['company']
 )
 
+# Columns of the companies bulk export
+COMPANY_EXPORT_COLUMNS = [Companies.id, Companies.name, Companies.AFM, Companies.email, Companies.telephone,
+                          Companies.city]
+
 
 @router.get("/companies", response_model=ResponseTotalItems[List[Company]], status_code=status.HTTP_200_OK)
-async def read_all_companies_endpoint(
-        db: Session = Depends(get_db),
+def read_all_companies_endpoint(
+        db: Session = Depends(get_read_db),
         name: Optional[str] = Query(None, description="Filter companies by name"),
         page: Optional[int] = Query(None, description="Page number"),
-        items_per_page: Optional[int] = Query(None, description="Number of items per page")
+        items_per_page: Optional[int] = Query(None, description="Number of items per page"),
+        after: Optional[str] = Query(None, description="Cursor of the previous page, replaces `page` when given"),
+        approximate_count: bool = Query(False, description="Estimate the total of unfiltered listings")
 ):
     """
     Fetches all companies from the database with optional name filtering and pagination.
@@ -33,18 +44,78 @@ async def read_all_companies_endpoint(
     - name (str, optional): Filter companies by name.
     - page (int, optional): Page number for pagination.
     - items_per_page (int, optional): Number of items per page.
+    - after (str, optional): The `next_cursor` of the previous page, for keyset pagination.
+    - approximate_count (bool): Return an estimated total, cheaper for large unfiltered listings.
 
     Returns:
     - ResponseWrapper[List[Companies]]: Filtered and optionally paginated list of companies wrapped in a response wrapper.
     """
-    companies, total_items = get_all_companies(db, name, page, items_per_page)
-    return ResponseTotalItems(data=companies, total_items=total_items,
+    companies, total_items, next_cursor = get_all_companies(db, name, page, items_per_page, after, approximate_count)
+    return ResponseTotalItems(data=companies, total_items=total_items, next_cursor=next_cursor,
                               message=Message(detail=Messages.ALL_COMPANIES_RETRIEVED))
 
 
+@router.get("/export/", status_code=status.HTTP_200_OK)
+def export_companies_endpoint(
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias='format', description="csv or ndjson"),
+        name: Optional[str] = Query(None, description="Filter companies by name"),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Streams all the companies matching the listing filters as CSV or NDJSON. Only admins can export companies.
+
+    The companies are read with a server-side cursor and sent in chunks while they are read, so the export
+    uses constant memory whatever the number of companies.
+
+    Parameters:
+    - export_format (ExportFormat): The output format, given as `format`.
+    - name (str, optional): Filter companies by name.
+    - current_user (Users): The current user.
+
+    Returns:
+    - StreamingResponse: The exported companies.
+
+    Raises:
+    - HTTPException: If the current user is not an admin.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    def generate_export():
+        with read_session() as db:
+            query = filter_companies(db.query(*COMPANY_EXPORT_COLUMNS), name)
+            rows = query.order_by(Companies.id).yield_per(EXPORT_CHUNK_SIZE)
+            yield from stream_rows(export_format, [column.key for column in COMPANY_EXPORT_COLUMNS], rows)
+
+    headers = {'Content-Disposition': f'attachment; filename="companies.{export_format.value}"'}
+    return StreamingResponse(content=generate_export(), headers=headers,
+                             media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@router.get("/search/", response_model=ResponseWrapper[List[Company]], status_code=status.HTTP_200_OK)
+def search_companies_endpoint(
+        q: str = Query(..., min_length=1, description="Part of the company name"),
+        limit: int = Query(10, ge=1, le=SEARCH_MAX_LIMIT, description="Maximum number of results"),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Search companies by name, ignoring accents and case.
+
+    Parameters:
+    - q (str): The search term.
+    - limit (int): The maximum number of results.
+    - db (Session): Database session.
+
+    Returns:
+    - ResponseWrapper[List[Company]]: The matching companies, best matches first.
+    """
+    companies = search_companies(db, q, limit)
+    return ResponseWrapper(data=companies, message=Message(detail=Messages.COMPANY_SEARCH_RESULTS))
+
+
 @router.post("/", response_model=ResponseWrapper[Company], status_code=status.HTTP_200_OK)
-async def create_company_endpoint(company_data: CompanyBase, db: Session = Depends(get_db),
-                                  current_user: Users = Depends(get_current_user)):
+def create_company_endpoint(company_data: CompanyBase, db: Session = Depends(get_db),
+                            current_user: Users = Depends(get_current_user)):
     if not is_admin(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail=Messages.UNAUTHORIZED_USER)
@@ -57,8 +128,8 @@ async def create_company_endpoint(company_data: CompanyBase, db: Session = Depen
 
 
 @router.put('/{company_id}', response_model=ResponseWrapper[Company], status_code=status.HTTP_200_OK)
-async def update_company_endpoint(company_id: int, company_data: CompanyBase, db: Session = Depends(get_db),
-                                  current_user: Users = Depends(get_current_user)):
+def update_company_endpoint(company_id: int, company_data: CompanyBase, db: Session = Depends(get_db),
+                            current_user: Users = Depends(get_current_user)):
     """
     Endpoint to update a company's information.
 
@@ -83,8 +154,8 @@ async def update_company_endpoint(company_id: int, company_data: CompanyBase, db
 
 
 @router.get("/delete/{company_id}", response_model=Message, status_code=status.HTTP_200_OK)
-async def delete_company_endpoint(company_id: int, db: Session = Depends(get_db),
-                                  current_user: Users = Depends(get_current_user)):
+def delete_company_endpoint(company_id: int, db: Session = Depends(get_db),
+                            current_user: Users = Depends(get_current_user)):
     """
     Endpoint to delete a company. Only accessible by admin users.
 
@@ -51,7 +51,7 @@ def submit_company_answers_endpoint(submissions: List[AnswerSubmission], interns
 
 
 @router.get("/{internship_id}", response_model=ResponseWrapper[List[QuestionWithAnswers]])
-async def get_company_responses_endpoint(internship_id: int, db: Session = Depends(get_db), ):
+def get_company_responses_endpoint(internship_id: int, db: Session = Depends(get_db), ):
     """
     Get all responses submitted by a company for a specific internship.
 
@@ -70,8 +70,8 @@ async def get_company_responses_endpoint(internship_id: int, db: Session = Depen
 
 
 @router.delete("/{internship_id}", status_code=status.HTTP_200_OK)
-async def delete_company_answers_endpoint(internship_id: int, db: Session = Depends(get_db),
-                                          current_user: Users = Depends(get_current_user)):
+def delete_company_answers_endpoint(internship_id: int, db: Session = Depends(get_db),
+                                    current_user: Users = Depends(get_current_user)):
     """
     Delete all answers submitted by a user.
 
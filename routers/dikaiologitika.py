@@ -1,30 +1,41 @@
 import os
-import zipfile
-from tempfile import NamedTemporaryFile
+from datetime import datetime
 from typing import List, Optional, Dict
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Query
 from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import FileResponse
+from starlette.requests import Request
+from starlette.responses import StreamingResponse, RedirectResponse
 
+from core.config import settings
 from core.constants import INTERNSHIP_PROGRAM_REQUIREMENTS
+from core.file_response import FileValidators, conditional_file_response
 from core.messages import Messages
+from core.storage import storage
+from core.streaming_export import stream_rows
+from core.zip_stream import stream_zip
+from crud.blob_crud import store_upload
 from crud.dikaiologitika_crud import create_dikaiologitika, get_files_by_user_id, get_all_files, update_file_path, \
-    get_file_by_id, delete_file
+    get_file_by_id, delete_file, determine_submission_time, get_cohort_files
 from crud.intership_crud import get_user_internship
 from crud.user_crud import get_user_by_id, is_admin, is_secretary
 from dependencies import get_db, get_current_user
 from models import Users, DikaiologitikaType, Dikaiologitika as DikaiologitikaModels, InternshipProgram, \
-    InternshipStatus
+    InternshipStatus, Department, SubmissionTime
 from schemas.dikaiologitika_schema import DikaiologitikaCreate, Dikaiologitika
+from schemas.export_schema import ExportFormat
 from schemas.response import ResponseWrapper, Message, FileAndUser
 from schemas.user_schema import User
 
 router = APIRouter(prefix='/dikaiologitika',
                    tags=['dikaiologitika'])
 
+# Columns of the manifest of the bulk archive
+MANIFEST_COLUMNS = ['folder', 'am', 'first_name', 'last_name', 'type', 'submission_time', 'date', 'file_name',
+                    'archived']
+
 
 @router.get("/types/", response_model=ResponseWrapper[Dict[str, List[Dict[str, str]]]], status_code=status.HTTP_200_OK)
 async def get_dikaiologitika_types_endpoint():
@@ -47,7 +58,7 @@ async def get_dikaiologitika_types_endpoint():
 
 
 @router.post("/", response_model=ResponseWrapper[Dikaiologitika], status_code=status.HTTP_200_OK)
-async def upload_dikaiologitika_endpoint(
+def upload_dikaiologitika_endpoint(
         file: UploadFile = File(...),
         type: DikaiologitikaType = Form(...),
         internship_program: InternshipProgram = Form(...),
@@ -95,12 +106,11 @@ async def upload_dikaiologitika_endpoint(
     if existing_files:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.FILE_ALREADY_SUBMITTED)
 
-    # Define the file location and save the file
-    file_location = f"files/{current_user.id}/{type.value}/{file.filename}"
-    os.makedirs(os.path.dirname(file_location), exist_ok=True)
+    # Reject a type the program does not require before storing anything
+    determine_submission_time(internship_program, type)
 
-    with open(file_location, "wb+") as file_object:
-        file_object.write(file.file.read())
+    # Store the file, an identical file already stored is reused
+    blob = store_upload(db, file)
 
     # Create the dikaiologitika record in the database
     dikaiologitika_data = DikaiologitikaCreate(type=type.value)
@@ -109,8 +119,11 @@ async def upload_dikaiologitika_endpoint(
         dikaiologitika=dikaiologitika_data,
         file_name=file.filename,
         user_id=current_user.id,
-        file_path=file_location,
-        internship_program=internship_program
+        file_path=blob.path,
+        internship_program=internship_program,
+        blob_id=blob.id,
+        file_size=blob.size,
+        checksum=blob.sha256
     )
 
     return ResponseWrapper(
@@ -121,7 +134,7 @@ async def upload_dikaiologitika_endpoint(
 
 @router.get("/user/{user_id}/files", response_model=ResponseWrapper[FileAndUser],
             status_code=status.HTTP_200_OK)
-async def read_files_for_user_endpoint(
+def read_files_for_user_endpoint(
         user_id: int,
         db: Session = Depends(get_db),
         file_type: Optional[DikaiologitikaType] = None,
@@ -167,7 +180,7 @@ async def read_files_for_user_endpoint(
 
 
 @router.get("/admin/files", response_model=ResponseWrapper[List[FileAndUser]], status_code=status.HTTP_200_OK)
-async def get_all_files_for_admin_endpoint(
+def get_all_files_for_admin_endpoint(
         file_type: DikaiologitikaType = None,
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -201,7 +214,7 @@ async def get_all_files_for_admin_endpoint(
 
 
 @router.put("/{dikaiologitika_id}/", response_model=Message, status_code=status.HTTP_200_OK)
-async def update_dikaiologitika_file_endpoint(
+def update_dikaiologitika_file_endpoint(
         dikaiologitika_id: int,
         file: UploadFile = File(...),
         db: Session = Depends(get_db),
@@ -229,24 +242,13 @@ async def update_dikaiologitika_file_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=Messages.FILE_NOT_FOUND)
 
-    # Define the new file location
-    new_file_location = f"files/{dikaiologitika.user_id}/{dikaiologitika.type.value}/{file.filename}"
-
-    try:
-        os.remove(dikaiologitika.file_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    # Store the new file, an unchanged file is detected by its checksum and not written again
+    blob = store_upload(db, file)
 
-    # Save the new file
-    os.makedirs(os.path.dirname(new_file_location), exist_ok=True)
-    with open(new_file_location, "wb+") as file_object:
-        file_object.write(file.file.read())
-
-    # Update the database record with the new file path
-    updated = update_file_path(db=db, file_id=dikaiologitika_id, new_file_path=new_file_location,
-                               file_name=file.filename)
+    # Update the database record with the new file, the old file is released
+    updated = update_file_path(db=db, file_id=dikaiologitika_id, new_file_path=blob.path,
+                               file_name=file.filename, blob_id=blob.id,
+                               file_size=blob.size, checksum=blob.sha256)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
 
@@ -254,14 +256,20 @@ async def update_dikaiologitika_file_endpoint(
 
 
 @router.get("/download/{file_id}")
-async def download_file_endpoint(file_id: int, db: Session = Depends(get_db),
-                                 current_user: Users = Depends(get_current_user)):
+def download_file_endpoint(file_id: int, request: Request, db: Session = Depends(get_db),
+                           current_user: Users = Depends(get_current_user)):
     """
     Downloads a file based on its ID, with access control checks to ensure
     that only the file owner or an admin can download the file.
 
+    The response carries an `ETag` (the checksum of the file) and a `Last-Modified`, so a client
+    revalidating its cached copy gets `304 Not Modified` without the file being read, and single
+    `Range` requests are answered with `206 Partial Content` so PDF viewers can load pages incrementally.
+    With an object store, the client is redirected to a presigned URL of the file instead.
+
     Parameters:
     - file_id (int): The ID of the file to download.
+    - request (Request): The request, for its conditional and range headers.
     - db (Session): Dependency injection of the database session to access the database.
     - current_user (Users): The user making the request, obtained through dependency injection.
 
@@ -270,7 +278,8 @@ async def download_file_endpoint(file_id: int, db: Session = Depends(get_db),
     - HTTPException: 404 Not Found if no file with the specified ID exists or the file is not accessible.
 
     Returns:
-    - FileResponse: The requested file to be downloaded.
+    - Response: The requested file (or the requested part of it) to be downloaded, 304 Not Modified or a
+      redirect to the object store.
     """
     # Retrieve the file's metadata from the database, including the user_id of the owner
     file_record = db.query(DikaiologitikaModels).filter(DikaiologitikaModels.id == file_id).first()
@@ -283,16 +292,34 @@ async def download_file_endpoint(file_id: int, db: Session = Depends(get_db),
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail=Messages.UNAUTHORIZED_USER)
 
-    # Construct the full path to the file
     file_path = file_record.file_path
-    if not os.path.isfile(file_path):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
+    file_name = file_record.file_name or os.path.basename(file_path)
+    if file_record.checksum and file_record.file_size is not None and file_record.modified_at:
+        validators = FileValidators.from_checksum(file_record.file_size, file_record.checksum,
+                                                  file_record.modified_at)
+        stored = None
+    else:
+        # Uploaded before the validators were stored
+        stored = storage.stat(file_path)
+        if stored is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
+        validators = FileValidators.from_stored(stored)
+
+    # A current cached copy is confirmed without touching the storage
+    if not validators.is_not_modified(request):
+        # An object store serves the file itself, from a temporary signed URL
+        url = storage.presigned_url(file_path, file_name, "application/pdf")
+        if url:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        if stored is None and not storage.exists(file_path):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
 
-    return FileResponse(path=file_path, filename=os.path.basename(file_path), media_type="application/pdf")
+    return conditional_file_response(request, file_path, validators, filename=file_name,
+                                     media_type="application/pdf")
 
 
 @router.get("/{file_id}", response_model=Message)
-async def delete_file_endpoint(
+def delete_file_endpoint(
         file_id: int,
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -324,7 +351,7 @@ async def delete_file_endpoint(
 
 
 @router.get("/user/{user_id}/download-zip", status_code=status.HTTP_200_OK)
-async def download_user_files_as_zip(
+def download_user_files_as_zip(
         user_id: int,
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -338,7 +365,7 @@ async def download_user_files_as_zip(
     - current_user (Users): The current authenticated user.
 
     Returns:
-    - FileResponse: The ZIP file containing all user's documents.
+    - StreamingResponse: The ZIP file containing all user's documents, generated while it is sent.
     """
     # Check if the current user is the owner of the file or an admin
     if user_id != current_user.id and not is_admin(current_user):
@@ -351,19 +378,18 @@ async def download_user_files_as_zip(
     if not files:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
 
-    # Create a list of file paths
-    file_paths = [file.file_path for file in files]
-
-    # Create a temporary ZIP file
-    with NamedTemporaryFile(delete=False, suffix=".zip") as temp_zip:
-        zip_filename = temp_zip.name
+    # The files with their names in the archive (blobs are stored by checksum), missing files are skipped
+    stored = storage.existing([file.file_path for file in files])
+    file_paths = [(file.file_path, file.file_name or os.path.basename(file.file_path)) for file in files
+                  if file.file_path in stored]
+    if not file_paths:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
 
-    # Create the ZIP file
-    create_zip_file(file_paths, zip_filename)
+    # The ZIP is generated while it is sent, nothing is written to disk
     formatted_filename = f"{user.first_name}_{user.last_name}_{user.AM}_files.zip"
     encoded_filename = quote(formatted_filename)
-    return FileResponse(
-        path=zip_filename,
+    return StreamingResponse(
+        stream_zip(file_paths),
         headers={
             "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
         },
@@ -371,9 +397,74 @@ async def download_user_files_as_zip(
     )
 
 
+@router.get("/export/zip/", status_code=status.HTTP_200_OK)
+def download_cohort_files_as_zip(
+        department: Optional[Department] = Query(None, description='Filter by Department'),
+        program: Optional[InternshipProgram] = Query(None, description="Filter by Internship Program"),
+        internship_status: Optional[InternshipStatus] = Query(None, description="Filter by Internship Status"),
+        submission_time: Optional[SubmissionTime] = Query(None, description="Filter by Submission Time"),
+        file_type: Optional[DikaiologitikaType] = Query(None, description="Filter by Dikaiologitika Type"),
+        db: Session = Depends(get_db),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Downloads the documents of every student whose internship matches the filters as a single ZIP file,
+    with one folder per student (named like the ZIP of `/user/{user_id}/download-zip`) and a `manifest.csv`
+    listing every document. Accessible to admins and secretaries.
+
+    The ZIP is generated while it is sent and the next files are read concurrently while one is written,
+    so nothing is written to disk and the download runs at disk speed.
+
+    Parameters:
+    - department (Optional[Department]): Filter by the department of the internship.
+    - program (Optional[InternshipProgram]): Filter by the program of the internship.
+    - internship_status (Optional[InternshipStatus]): Filter by the status of the internship.
+    - submission_time (Optional[SubmissionTime]): Filter by the submission time of the documents.
+    - file_type (Optional[DikaiologitikaType]): Filter by document type.
+    - db (Session): The database session.
+    - current_user (Users): The current authenticated user.
+
+    Returns:
+    - StreamingResponse: The ZIP file containing the documents and the manifest.
+
+    Raises:
+    - HTTPException: 403 if the current user is not an admin or a secretary.
+    - HTTPException: 404 if no document matches the filters.
+    """
+    if not is_admin(current_user) and not is_secretary(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    files = get_cohort_files(db, department, program, internship_status, submission_time, file_type)
+    if not files:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.FILE_NOT_FOUND)
+
+    # Every file in the folder of its student, files missing from the storage are only listed in the manifest
+    stored = storage.existing([file.file_path for file in files])
+    file_paths = []
+    manifest_rows = []
+    for file in files:
+        folder = f"{file.first_name}_{file.last_name}_{file.AM}".replace('/', '_')
+        file_name = file.file_name or os.path.basename(file.file_path)
+        archived = file.file_path in stored
+        if archived:
+            file_paths.append((file.file_path, f"{folder}/{file_name}"))
+        manifest_rows.append((folder, file.AM, file.first_name, file.last_name, file.type, file.submission_time,
+                              file.date, file_name, archived))
+    manifest = b''.join(stream_rows(ExportFormat.CSV, MANIFEST_COLUMNS, manifest_rows))
+
+    formatted_filename = f"dikaiologitika_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_zip([(manifest, 'manifest.csv')] + file_paths, read_ahead=settings.ZIP_READ_WORKERS),
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(formatted_filename)}"
+        },
+        media_type='application/zip'
+    )
+
+
 @router.post("/secretary/upload/{user_id}", response_model=ResponseWrapper[Dikaiologitika],
              status_code=status.HTTP_200_OK)
-async def upload_bebaiosi_praktikis_by_secretary(
+def upload_bebaiosi_praktikis_by_secretary(
         user_id: int,
         file: UploadFile = File(...),
         db: Session = Depends(get_db),
@@ -403,18 +494,14 @@ async def upload_bebaiosi_praktikis_by_secretary(
         DikaiologitikaModels.type == DikaiologitikaType.BebaiosiPraktikisApoGramateia
     ).first()
 
-    # Define the file location
-    file_location = f"files/{user_id}/{DikaiologitikaType.BebaiosiPraktikisApoGramateia.value}/{file.filename}"
-    os.makedirs(os.path.dirname(file_location), exist_ok=True)
-
-    # Save the new file
-    with open(file_location, "wb+") as file_object:
-        file_object.write(file.file.read())
+    # Store the new file, an identical file already stored is reused
+    blob = store_upload(db, file)
 
     if existing_file:
         # Update the existing file record using update_file_path method
-        updated = update_file_path(db=db, file_id=existing_file.id, new_file_path=file_location,
-                                   file_name=file.filename)
+        updated = update_file_path(db=db, file_id=existing_file.id, new_file_path=blob.path,
+                                   file_name=file.filename, blob_id=blob.id,
+                                   file_size=blob.size, checksum=blob.sha256)
         if not updated:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update the file.")
         dikaiologitika = existing_file
@@ -426,8 +513,11 @@ async def upload_bebaiosi_praktikis_by_secretary(
             dikaiologitika=dikaiologitika_data,
             file_name=file.filename,
             user_id=user_id,
-            file_path=file_location,
-            internship_program=internship.program
+            file_path=blob.path,
+            internship_program=internship.program,
+            blob_id=blob.id,
+            file_size=blob.size,
+            checksum=blob.sha256
         )
 
     # Update internship status to SUBMIT_START_FILES
@@ -440,11 +530,3 @@ async def upload_bebaiosi_praktikis_by_secretary(
         message=Message(detail=Messages.FILE_UPDATED_SUCCESS if existing_file else Messages.FILE_UPLOADED_SUCCESS)
     )
 
-
-# Helper function to create the ZIP file
-def create_zip_file(file_paths: List[str], zip_filename: str) -> str:
-    with zipfile.ZipFile(zip_filename, 'w') as zipf:
-        for file_path in file_paths:
-            arcname = os.path.basename(file_path)
-            zipf.write(file_path, arcname)
-    return zip_filename
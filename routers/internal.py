@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from starlette import status
+
+from core.messages import Messages
+from crud.user_crud import is_admin
+from database import pool_metrics
+from dependencies import get_current_user
+from models import Users
+from schemas.metrics_schema import PoolStatus
+from schemas.response import ResponseWrapper, Message
+
+router = APIRouter(
+    prefix='/internal',
+    tags=['internal']
+)
+
+
+@router.get("/db/pool", response_model=ResponseWrapper[PoolStatus], status_code=status.HTTP_200_OK)
+async def get_pool_status_endpoint(current_user: Users = Depends(get_current_user)):
+    """
+    Reports the connection pool usage of the worker that serves the request. Only accessible by admin users.
+
+    Each worker process owns its own pool, so repeated calls may be answered by different workers;
+    the `pid` field identifies which one.
+
+    Parameters:
+    - current_user (Users): The current authenticated user, must be an admin.
+
+    Returns:
+    - ResponseWrapper[PoolStatus]: The pool configuration, live usage and connection wait times.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    return ResponseWrapper(data=pool_metrics.snapshot(), message=Message(detail=Messages.POOL_METRICS_RETRIEVED))
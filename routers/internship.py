@@ -1,22 +1,29 @@
-from io import BytesIO
 from typing import List, Optional, Union
 from urllib.parse import quote
 
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import StreamingResponse
+from starlette.responses import StreamingResponse, FileResponse
 
+from core.export_jobs import export_jobs, read_data_version
 from core.messages import Messages
+from core.streaming_export import stream_rows, EXPORT_MEDIA_TYPES, EXPORT_CHUNK_SIZE
+from core.supervisors import supervisor_directory
+from core.xlsx import stream_xlsx, XLSX_MEDIA_TYPE
 from crud.company_crud import get_company
-from crud.intership_crud import get_user_internship, delete_internship, \
+from crud.intership_crud import get_user_internship, delete_internship, delete_internships, \
     create_or_update_internship, update_internship_status, get_all_internships, get_internship_by_id, \
-    fetch_active_internships_with_details, fetch_supervisors
+    fetch_active_internships_with_details, query_internships, bulk_update_internship_status, \
+    get_internships_readiness, get_internship_summary
 from crud.user_crud import is_admin, get_user_by_id, is_secretary
-from dependencies import get_db, get_current_user
-from models import Users, InternshipProgram, InternshipStatus, Department
-from schemas.internship_schema import InternshipRead, InternshipCreate, InternshipAllRead, InternshipUpdate
+from dependencies import get_db, get_current_user, get_read_db, read_session
+from models import Users, Companies, InternshipProgram, InternshipStatus, Department, SubmissionTime, \
+    Internship as InternshipModel
+from schemas.export_schema import ExportJob, ExportJobStatus, ActiveInternshipsExportCreate, ExportFormat
+from schemas.internship_schema import InternshipRead, InternshipCreate, InternshipAllRead, InternshipUpdate, \
+    InternshipBulkStatusUpdate, InternshipStatusUpdateResult, InternshipStatusUpdateOutcome, InternshipReadiness, \
+    InternshipBulkDelete, InternshipSummary
 from schemas.response import ResponseWrapper, Message, ResponseTotalItems
 
 router = APIRouter(
@@ -24,10 +31,27 @@ router = APIRouter(
     tags=['internship']
 )
 
+# Column headers of the active internships export, in the order of the exported row columns
+EXPORT_COLUMNS = [
+    "ΟΝΟΜΑ",
+    "ΕΠΙΘΕΤΟ",
+    "ΑΡΙΘΜΟΣ ΜΗΤΡΩΟΥ",
+    "EMAIL",
+    "ΤΗΛΕΦΩΝΟ",
+    "ΗΜΕΡΟΜΗΝΙΑ ΕΝΑΡΞΗΣ ΠΡΑΚΤΙΚΗΣ",
+    "ΗΜΕΡΟΜΗΝΙΑ ΛΗΞΗΣ ΠΡΑΚΤΙΚΗΣ",
+    "ΕΠΟΠΤΗΣ",
+    "ΟΝΟΜΑ ΕΤΑΙΡΕΙΑΣ",
+    "ΑΦΜ ΕΤΑΙΡΕΙΑΣ",
+    "EMAIL ΕΤΑΙΡΕΙΑΣ",
+    "ΤΗΛΕΦΩΝΟ ΕΤΑΙΡΕΙΑΣ",
+    "ΠΟΛΗ ΕΤΑΙΡΕΙΑΣ",
+]
+
 
 @router.get("/all/", response_model=ResponseTotalItems[List[InternshipAllRead]], status_code=status.HTTP_200_OK)
-async def get_all_internships_endpoint(
-        db: Session = Depends(get_db),
+def get_all_internships_endpoint(
+        db: Session = Depends(get_read_db),
         current_user: Users = Depends(get_current_user),
         department: Optional[Department] = Query(None, description='Filter by Department'),
         internship_status: Optional[InternshipStatus] = Query(None, description="Filter by Internship Status"),
@@ -37,7 +61,9 @@ async def get_all_internships_endpoint(
         sendBySecretary: bool = Query(False,
                                       description="If true, filters by secretary-uploaded document (AitisiPraktikis)"),
         page: int = Query(1, description="Page number"),
-        items_per_page: int = Query(10, description="Number of items per page")
+        items_per_page: int = Query(10, description="Number of items per page"),
+        after: Optional[str] = Query(None, description="Cursor of the previous page, replaces `page` when given"),
+        approximate_count: bool = Query(False, description="Estimate the total of unfiltered listings")
 ):
     """
     Retrieves all internships, with optional filters for department, status, program, user academic number,
@@ -55,6 +81,8 @@ async def get_all_internships_endpoint(
     - sendBySecretary (bool): If true, limits results to those where 'AitisiPraktikis' document was uploaded.
     - page (int): Page number for pagination.
     - items_per_page (int): Number of items per page.
+    - after (Optional[str]): The `next_cursor` of the previous page, for keyset pagination.
+    - approximate_count (bool): Return an estimated total, cheaper for large unfiltered listings.
 
     Returns:
     - ResponseTotalItems[List[InternshipAllRead]]: A list of internships with detailed information.
@@ -62,7 +90,7 @@ async def get_all_internships_endpoint(
     if not is_admin(current_user) and not is_secretary(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
 
-    internships, total_items = get_all_internships(
+    internships, total_items, next_cursor = get_all_internships(
         db=db,
         internship_status=internship_status,
         department=department,
@@ -71,18 +99,67 @@ async def get_all_internships_endpoint(
         company_name=company_name,
         send_by_secretary=sendBySecretary if is_secretary(current_user) else False,
         page=page,
-        items_per_page=items_per_page
+        items_per_page=items_per_page,
+        after=after,
+        approximate_count=approximate_count
     )
 
     return ResponseTotalItems(
         data=internships,
         total_items=total_items,
+        next_cursor=next_cursor,
         message=Message(detail=Messages.ALL_INTERNSHIPS_RETRIEVED)
     )
 
 
+@router.get("/summary/", response_model=ResponseWrapper[InternshipSummary], status_code=status.HTTP_200_OK)
+def get_internship_summary_endpoint(
+        db: Session = Depends(get_read_db),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Retrieves the internship counts of the dashboard: the total and the counts per status, department,
+    program and every combination of them. Only accessible by admin and secretary users.
+
+    Returns:
+    - ResponseWrapper[InternshipSummary]: The internship counts.
+    """
+    if not is_admin(current_user) and not is_secretary(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    return ResponseWrapper(data=get_internship_summary(db),
+                           message=Message(detail=Messages.INTERNSHIP_SUMMARY_RETRIEVED))
+
+
+@router.get("/readiness/", response_model=ResponseWrapper[List[InternshipReadiness]], status_code=status.HTTP_200_OK)
+def get_internships_readiness_endpoint(
+        submission_time: SubmissionTime = Query(..., description="The review the files are required for"),
+        db: Session = Depends(get_read_db),
+        current_user: Users = Depends(get_current_user),
+        department: Optional[Department] = Query(None, description='Filter by Department'),
+        internship_status: Optional[InternshipStatus] = Query(None, description="Filter by Internship Status"),
+        program: Optional[InternshipProgram] = Query(None, description="Filter by Internship Program"),
+        user_am: Optional[str] = Query(None, description="Filter by User AM"),
+        ready: Optional[bool] = Query(None, description="Only the internships that are (or are not) ready")
+):
+    """
+    Reports, for every internship matching the filters, how many of the files required for the START or
+    END review have been submitted and which are missing. Only accessible by admin users.
+
+    Returns:
+    - ResponseWrapper[List[InternshipReadiness]]: The readiness of every matching internship.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    readiness = get_internships_readiness(db=db, submission_time=submission_time,
+                                          internship_status=internship_status, program=program,
+                                          department=department, user_am=user_am, ready=ready)
+    return ResponseWrapper(data=readiness, message=Message(detail=Messages.INTERNSHIPS_READINESS_RETRIEVED))
+
+
 @router.post("/", response_model=ResponseWrapper[InternshipRead], status_code=status.HTTP_200_OK)
-async def create_or_update_internship_endpoint(
+def create_or_update_internship_endpoint(
         internship: Union[InternshipCreate, InternshipUpdate],
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -96,8 +173,8 @@ async def create_or_update_internship_endpoint(
 
 
 @router.get('/{user_id}', response_model=ResponseWrapper[InternshipRead], status_code=status.HTTP_200_OK)
-async def get_internship_by_user_endpoint(user_id: int, db: Session = Depends(get_db),
-                                          current_user: Users = Depends(get_current_user)):
+def get_internship_by_user_endpoint(user_id: int, db: Session = Depends(get_db),
+                                    current_user: Users = Depends(get_current_user)):
     internship = get_user_internship(db, user_id)
     if internship is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -121,8 +198,8 @@ async def get_internship_by_user_endpoint(user_id: int, db: Session = Depends(ge
 
 
 @router.get("/delete/{internship_id}", response_model=Message, status_code=status.HTTP_200_OK)
-async def delete_internship_endpoint(internship_id: int, db: Session = Depends(get_db),
-                                     current_user: Users = Depends(get_current_user)):
+def delete_internship_endpoint(internship_id: int, db: Session = Depends(get_db),
+                               current_user: Users = Depends(get_current_user)):
     """
     Endpoint to delete a company. Only accessible by admin users.
 
@@ -146,8 +223,55 @@ async def delete_internship_endpoint(internship_id: int, db: Session = Depends(g
                             detail=Messages.INTERNSHIP_DELETION_FAILED)
 
 
+@router.post("/delete/bulk/", response_model=ResponseWrapper[List[int]], status_code=status.HTTP_200_OK)
+def delete_internships_endpoint(
+        delete: InternshipBulkDelete,
+        db: Session = Depends(get_db),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Deletes several internships, with the files and answers of their students, in one transaction.
+    The files are removed from disk in the background. Only accessible by admin users.
+
+    Returns:
+    - ResponseWrapper[List[int]]: The IDs of the deleted internships, unknown IDs are skipped.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    deleted_ids = delete_internships(db, delete.internship_ids)
+    return ResponseWrapper(data=deleted_ids, message=Message(
+        detail=Messages.INTERNSHIPS_DELETED.format(deleted=len(deleted_ids),
+                                                   total=len(set(delete.internship_ids)))))
+
+
+@router.put("/status/bulk/", response_model=ResponseWrapper[List[InternshipStatusUpdateResult]],
+            status_code=status.HTTP_200_OK)
+def bulk_update_internship_status_endpoint(
+        update: InternshipBulkStatusUpdate,
+        db: Session = Depends(get_db),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Update the status of several internships in one transaction and report the result of every ID.
+    The same rules as the single update apply: only admins can set ACTIVE or ENDED, other users can
+    only update their own internships and must have submitted the required files.
+    """
+    isCurrentUserAdmin = is_admin(current_user)
+    if update.status in {InternshipStatus.ACTIVE, InternshipStatus.ENDED} and not isCurrentUserAdmin:
+        # Only admins can change status to ACTIVE or ENDED
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    results = bulk_update_internship_status(db=db, internship_ids=update.internship_ids,
+                                            internship_status=update.status, current_user_id=current_user.id,
+                                            isCurrentUserAdmin=isCurrentUserAdmin)
+    updated = sum(result.outcome == InternshipStatusUpdateOutcome.UPDATED for result in results)
+    return ResponseWrapper(data=results, message=Message(
+        detail=Messages.INTERNSHIPS_STATUS_UPDATED.format(updated=updated, total=len(results))))
+
+
 @router.put("/{internship_id}", response_model=ResponseWrapper[InternshipRead], status_code=status.HTTP_200_OK)
-async def update_internship_status_endpoint(
+def update_internship_status_endpoint(
         internship_id: int,
         internship_status: InternshipStatus,
         db: Session = Depends(get_db),
@@ -192,9 +316,60 @@ async def update_internship_status_endpoint(
     return ResponseWrapper(data=updated_internship, message=Message(detail=Messages.INTERNSHIP_STATUS_UPDATED))
 
 
+@router.get("/export/", status_code=status.HTTP_200_OK)
+def export_internships_endpoint(
+        current_user: Users = Depends(get_current_user),
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias='format', description="csv or ndjson"),
+        department: Optional[Department] = Query(None, description='Filter by Department'),
+        internship_status: Optional[InternshipStatus] = Query(None, description="Filter by Internship Status"),
+        program: Optional[InternshipProgram] = Query(None, description="Filter by Internship Program"),
+        user_am: Optional[str] = Query(None, description="Filter by User AM"),
+        company_name: Optional[str] = Query(None, description="Filter by Company Name"),
+        sendBySecretary: bool = Query(False,
+                                      description="If true, filters by secretary-uploaded document (AitisiPraktikis)")
+):
+    """
+    Streams the internships of any status matching the filters of `/internship/all/` as CSV or NDJSON,
+    with the same columns as the listing. Accessible to admins and secretaries.
+
+    The internships are read with a server-side cursor and sent in chunks while they are read, so the
+    export uses constant memory whatever the number of internships.
+
+    Parameters:
+    - current_user (Users): The current authenticated user.
+    - export_format (ExportFormat): The output format, given as `format`.
+    - department (Optional[Department]): Filter by department.
+    - internship_status (Optional[InternshipStatus]): Filter by internship status.
+    - program (Optional[InternshipProgram]): Filter by internship program.
+    - user_am (Optional[str]): Filter by user academic number.
+    - company_name (Optional[str]): Filter by company name.
+    - sendBySecretary (bool): If true, limits results to those where 'AitisiPraktikis' document was uploaded.
+
+    Returns:
+    - StreamingResponse: The exported internships.
+
+    Raises:
+    - HTTPException: If the current user is not an admin or a secretary.
+    """
+    if not is_admin(current_user) and not is_secretary(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    send_by_secretary = sendBySecretary if is_secretary(current_user) else False
+
+    def generate_export():
+        with read_session() as db:
+            query = query_internships(db, internship_status, program, department, user_am, company_name,
+                                      send_by_secretary)
+            columns = [column['name'] for column in query.column_descriptions]
+            rows = query.order_by(InternshipModel.id).yield_per(EXPORT_CHUNK_SIZE)
+            yield from stream_rows(export_format, columns, rows)
+
+    headers = {'Content-Disposition': f'attachment; filename="internships.{export_format.value}"'}
+    return StreamingResponse(content=generate_export(), headers=headers,
+                             media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
 @router.get("/export/active_internships/")
 async def export_internships_to_excel(
-        db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user),
         department: Department = Query(None, description="Filter by department"),
         program: InternshipProgram = Query(None, description="Filter by internship program")
@@ -203,8 +378,10 @@ async def export_internships_to_excel(
     Exports details of active internships to an Excel file, filtered by department and program.
     This endpoint is accessible only to users with admin privileges.
 
+    The workbook is streamed while the internships are read in chunks, so memory use does not grow
+    with the number of exported internships.
+
     Parameters:
-    - db (Session): Database session dependency injection.
     - current_user (Users): The current user performing the operation, must be an admin.
     - department (Department, optional): Filter internships by a specific department.
     - program (InternshipProgram, optional): Filter internships by a specific internship program.
@@ -222,53 +399,133 @@ async def export_internships_to_excel(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail=Messages.UNAUTHORIZED_USER)
 
-    # Data retrieval
-    internships = fetch_active_internships_with_details(db, program, department)
-
-    # Prepare Excel data
-    data = [{
-        "ΟΝΟΜΑ": getattr(intern.user, 'first_name', None),
-        "ΕΠΙΘΕΤΟ": getattr(intern.user, 'last_name', None),
-        "ΑΡΙΘΜΟΣ ΜΗΤΡΩΟΥ": getattr(intern.user, 'AM', None),
-        "EMAIL": getattr(intern.user, 'email', None),
-        "ΤΗΛΕΦΩΝΟ": getattr(intern.user, 'telephone_number', None),
-        "ΗΜΕΡΟΜΗΝΙΑ ΕΝΑΡΞΗΣ ΠΡΑΚΤΙΚΗΣ": intern.start_date.strftime("%Y-%m-%d") if intern.start_date else None,
-        "ΗΜΕΡΟΜΗΝΙΑ ΛΗΞΗΣ ΠΡΑΚΤΙΚΗΣ": intern.end_date.strftime("%Y-%m-%d") if intern.end_date else None,
-        "ΕΠΟΠΤΗΣ": intern.supervisor,
-        "ΟΝΟΜΑ ΕΤΑΙΡΕΙΑΣ": getattr(intern.company, 'name', None) if intern.company else None,
-        "ΑΦΜ ΕΤΑΙΡΕΙΑΣ": getattr(intern.company, 'AFM', None) if intern.company else None,
-        "EMAIL ΕΤΑΙΡΕΙΑΣ": getattr(intern.company, 'email', None) if intern.company else None,
-        "ΤΗΛΕΦΩΝΟ ΕΤΑΙΡΕΙΑΣ": getattr(intern.company, 'telephone', None) if intern.company else None,
-        "ΠΟΛΗ ΕΤΑΙΡΕΙΑΣ": getattr(intern.company, 'city', None) if intern.company else None,
-    } for intern in internships]
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df = pd.DataFrame(data)
-        df.to_excel(writer, index=False, sheet_name='Ενεργές Πρακτικές')
-    output.seek(0)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{active_internships_filename(department, program)}"'
+    }
+    # Starlette runs each step of this sync generator in the threadpool, off the event loop
+    return StreamingResponse(content=generate_active_internships_workbook(department, program), headers=headers,
+                             media_type=XLSX_MEDIA_TYPE)
+
+
+@router.post("/export/active_internships/jobs/", response_model=ResponseWrapper[ExportJob],
+             status_code=status.HTTP_202_ACCEPTED)
+def submit_active_internships_export_job(
+        export_data: ActiveInternshipsExportCreate,
+        db: Session = Depends(get_db),
+        current_user: Users = Depends(get_current_user)
+):
+    """
+    Starts generating the active internships Excel file in the background, for exports too large to be
+    downloaded within a single request. Submitting the same filters again while the data has not changed
+    returns the existing job, so a finished file is served again without being regenerated.
+    This endpoint is accessible only to users with admin privileges.
+
+    Parameters:
+    - export_data (ActiveInternshipsExportCreate): The department and program filters of the export.
+    - db (Session): The database session, used to read the version of the exported data.
+    - current_user (Users): The current user performing the operation, must be an admin.
+
+    Returns:
+    - ResponseWrapper[ExportJob]: The export job, to be polled until its status is `done`.
+
+    Raises:
+    - HTTPException: If the current user is not authorized as an admin.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+
+    department, program = export_data.department, export_data.program
+
+    def build(path: str):
+        # Read from the primary, like the data version, so a lagging replica is never cached as current
+        with open(path, 'wb') as file_object:
+            for chunk in generate_active_internships_workbook(department, program, primary=True):
+                file_object.write(chunk)
+
+    job = export_jobs.submit(
+        name='active_internships',
+        filters=export_data.model_dump(mode='json'),
+        data_version=read_data_version(db, [Companies, InternshipModel, Users]),
+        filename=active_internships_filename(department, program),
+        build=build
+    )
+    return ResponseWrapper(data=job, message=Message(detail=Messages.EXPORT_JOB_SUBMITTED))
+
 
+@router.get("/export/jobs/{job_id}/", response_model=ResponseWrapper[ExportJob], status_code=status.HTTP_200_OK)
+def get_export_job(job_id: str, current_user: Users = Depends(get_current_user)):
+    """
+    Retrieves the status of a background export job.
+
+    Parameters:
+    - job_id (str): The ID returned when the export was submitted.
+    - current_user (Users): The current user performing the operation, must be an admin.
+
+    Returns:
+    - ResponseWrapper[ExportJob]: The export job.
+
+    Raises:
+    - HTTPException: If the current user is not an admin, or the job is unknown or expired.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.EXPORT_JOB_NOT_FOUND)
+    return ResponseWrapper(data=job, message=Message(detail=Messages.EXPORT_JOB_RETRIEVED))
+
+
+@router.get("/export/jobs/{job_id}/download", status_code=status.HTTP_200_OK)
+def download_export_job(job_id: str, current_user: Users = Depends(get_current_user)):
+    """
+    Downloads the file of a finished export job.
+
+    Parameters:
+    - job_id (str): The ID returned when the export was submitted.
+    - current_user (Users): The current user performing the operation, must be an admin.
+
+    Returns:
+    - FileResponse: The exported file.
+
+    Raises:
+    - HTTPException: If the current user is not an admin, the job is unknown or expired, or the file is not ready.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=Messages.EXPORT_JOB_NOT_FOUND)
+    if job.status != ExportJobStatus.DONE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=Messages.EXPORT_NOT_READY)
+    return FileResponse(path=job.path, media_type=XLSX_MEDIA_TYPE,
+                        headers={'Content-Disposition': f'attachment; filename="{job.filename}"'})
+
+
+def generate_active_internships_workbook(department: Optional[Department], program: Optional[InternshipProgram],
+                                         primary: bool = False):
+    """
+    Generate the active internships workbook chunk by chunk, reading the internships in chunks.
+
+    The session is opened here rather than injected, since the generator outlives the request dependencies.
+    """
+    with read_session(primary) as db:
+        rows = fetch_active_internships_with_details(db, program, department)
+        yield from stream_xlsx('Ενεργές Πρακτικές', EXPORT_COLUMNS, rows)
+
+
+def active_internships_filename(department: Optional[Department], program: Optional[InternshipProgram]) -> str:
     # Safe encoding for filename
     department_str = quote(department.value) if department else "All"
     program_str = quote(program.value) if program else "All"
-    filename = f"Active_Internships_{department_str}_{program_str}.xlsx"
-
-    headers = {
-        'Content-Disposition': f'attachment; filename="{filename}"'
-    }
-    return StreamingResponse(content=output, headers=headers,
-                             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    return f"Active_Internships_{department_str}_{program_str}.xlsx"
 
 
 @router.get("/get_supervisors/", status_code=status.HTTP_200_OK)
 async def get_supervisors(search: Optional[str] = None):
     """
-    Fetch all supervisors from an external API and optionally filter them by a search term.
+    Fetch all supervisors and optionally filter them by a search term, ignoring accents and case.
+
+    The names come from an external API but are served from an in-memory snapshot that is refreshed
+    in the background, so this can be called on every keystroke.
     """
-    try:
-        supervisors = fetch_supervisors()
-        if search:
-            supervisors = [name for name in supervisors if search.lower() in name.lower()]
-        return supervisors
-    except HTTPException as e:
-        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return await supervisor_directory.search(search)
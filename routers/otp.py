@@ -25,7 +25,7 @@ expires_in_seconds = settings.ACCESS_TOKEN_EXPIRES_MINUTES * 60
 
 
 @router.get('/generate/', response_model=ResponseWrapper[OtpBase], status_code=status.HTTP_200_OK)
-async def generate_otp(current_user: Users = Depends(get_current_user), db: Session = Depends(get_db)):
+def generate_otp(current_user: Users = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Generate and send an OTP to the user.
 
@@ -50,7 +50,7 @@ async def generate_otp(current_user: Users = Depends(get_current_user), db: Sess
 
 
 @router.get('/validate/{otp}', response_model=ResponseWrapper[OtpValid], status_code=status.HTTP_200_OK)
-async def validate_otp(otp: str, db: Session = Depends(get_db)):
+def validate_otp(otp: str, db: Session = Depends(get_db)):
     """
     Validate the OTP provided by the user.
 
@@ -8,7 +8,7 @@ from core.messages import Messages
 from crud.questions_crud import create_question_db, get_questions, update_question, delete_question, \
     get_questions_statistics
 from crud.user_crud import is_admin
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, get_read_db
 from models import Users, Question
 from schemas.question_schema import Question, QuestionCreate, QuestionUpdate, QuestionType, QuestionnaireType
 from schemas.question_statistics import QuestionStatistics
@@ -31,7 +31,7 @@ async def get_questions_types_endpoint(
 
 
 @router.post("/", response_model=ResponseWrapper[List[Question]], status_code=status.HTTP_200_OK)
-async def admin_create_questions_endpoint(
+def admin_create_questions_endpoint(
         questions_data: List[QuestionCreate],
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -114,7 +114,7 @@ def admin_update_question_endpoint(
 
 
 @router.delete('/{question_id}', response_model=Message, status_code=status.HTTP_200_OK)
-async def admin_delete_question_endpoint(
+def admin_delete_question_endpoint(
         question_id: int,
         db: Session = Depends(get_db),
         current_user: Users = Depends(get_current_user)
@@ -145,8 +145,8 @@ async def admin_delete_question_endpoint(
 
 
 @router.get('/stats/answers/', response_model=ResponseWrapper[List[QuestionStatistics]], status_code=status.HTTP_200_OK)
-async def admin_get_answers_statistics_endpoint(
-        db: Session = Depends(get_db),
+def admin_get_answers_statistics_endpoint(
+        db: Session = Depends(get_read_db),
         current_user: Users = Depends(get_current_user),
         questionnaire_type: QuestionnaireType = Query(...,
                                                       description="The type of questionnaire to filter statistics by")
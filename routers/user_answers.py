@@ -41,8 +41,8 @@ def submit_answers_endpoint(submissions: List[AnswerSubmission], db: Session = D
 
 
 @router.get("/{user_id}", response_model=ResponseWrapper[List[QuestionWithAnswers]])
-async def get_user_responses_endpoint(user_id: int, db: Session = Depends(get_db),
-                                      current_user: Users = Depends(get_current_user)):
+def get_user_responses_endpoint(user_id: int, db: Session = Depends(get_db),
+                                current_user: Users = Depends(get_current_user)):
     """
     Get all responses for a given user.
 
@@ -65,8 +65,8 @@ async def get_user_responses_endpoint(user_id: int, db: Session = Depends(get_db
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_200_OK)
-async def delete_answers_endpoint(user_id: int, db: Session = Depends(get_db),
-                                  current_user: Users = Depends(get_current_user)):
+def delete_answers_endpoint(user_id: int, db: Session = Depends(get_db),
+                            current_user: Users = Depends(get_current_user)):
     """
     Delete all answers submitted by a user.
 
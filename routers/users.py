@@ -4,13 +4,20 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Response, Query
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.responses import StreamingResponse
 
 from core.auth import create_access_token
 from core.config import settings
+from core.count_cache import count_total
 from core.messages import Messages
-from crud.user_crud import get_user_by_id, create_user, get_user_by_AM, is_admin, is_super_admin
-from dependencies import get_db, get_current_user
+from core.pagination import paginate_query, split_page
+from core.search import SEARCH_MAX_LIMIT
+from core.streaming_export import stream_rows, EXPORT_MEDIA_TYPES, EXPORT_CHUNK_SIZE
+from crud.user_crud import get_user_by_id, create_user, get_user_by_AM, is_admin, is_super_admin, is_secretary, \
+    search_users, filter_users
+from dependencies import get_db, get_current_user, get_read_db, read_session
 from models import Users, UserRole, Department
+from schemas.export_schema import ExportFormat
 from schemas.response import ResponseWrapper, Message, ResponseTotalItems
 from schemas.user_schema import User, UserCreate, UserUpdate
 
@@ -22,6 +29,25 @@ router = APIRouter(
 expires_time = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_MINUTES)
 expires_in_seconds = settings.ACCESS_TOKEN_EXPIRES_MINUTES * 60
 
+# Columns of the users bulk export
+USER_EXPORT_COLUMNS = [Users.id, Users.AM, Users.first_name, Users.last_name, Users.email, Users.telephone_number,
+                       Users.reg_year, Users.department, Users.role]
+
+
+def parse_user_role(role: Optional[str]) -> Optional[UserRole]:
+    """
+    Convert the role query parameter of the user listings.
+
+    Raises:
+    - HTTPException: If the role is not valid.
+    """
+    if not role:
+        return None
+    try:
+        return UserRole(role)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_ROLE)
+
 
 @router.get('/department-types', response_model=ResponseWrapper[List[str]], status_code=status.HTTP_200_OK)
 async def get_department_types_endpoint():
@@ -34,13 +60,15 @@ async def get_department_types_endpoint():
 
 
 @router.get('/', response_model=ResponseTotalItems[List[User]], status_code=status.HTTP_200_OK)
-async def read_users_endpoint(
-        db: Session = Depends(get_db),
+def read_users_endpoint(
+        db: Session = Depends(get_read_db),
         am: Optional[str] = Query(None, description="Filter users by Academic Number (AM)"),
         role: Optional[str] = Query(None, description="Filter users by role"),
         department: Optional[Department] = Query(None, description="Filter users by department"),
         page: int = Query(1, description="Page number"),
-        items_per_page: int = Query(10, description="Number of items per page")):
+        items_per_page: int = Query(10, description="Number of items per page"),
+        after: Optional[str] = Query(None, description="Cursor of the previous page, replaces `page` when given"),
+        approximate_count: bool = Query(False, description="Estimate the total of unfiltered listings")):
     """
     Retrieve users from the database with optional filters for AM, role, and department.
 
@@ -51,43 +79,98 @@ async def read_users_endpoint(
     - department (str): Filter by department.
     - page (int): Page number for pagination.
     - items_per_page (int): Number of items per page.
+    - after (str): The `next_cursor` of the previous page, for keyset pagination.
+    - approximate_count (bool): Return an estimated total, cheaper for large unfiltered listings.
 
     Returns:
     - ResponseTotalItems[List[User]]: Response containing the filtered user list and total item count.
     """
-    query = db.query(Users)
-
-    if am:
-        query = query.filter(Users.AM.ilike(f"%{am}%"))
+    query = filter_users(db.query(Users), am, parse_user_role(role), department)
 
-    if role:
-        try:
-            query = query.filter(Users.role == UserRole(role))
-        except KeyError:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_ROLE)
+    is_filtered = any([am, role, department])
+    total_items = count_total(db, query, Users.__table__, approximate=approximate_count and not is_filtered)
 
-    if department:
-        try:
-            query = query.filter(Users.department == Department(department))
-        except KeyError:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=Messages.INVALID_DEPARTMENT)
-
-    total_items = query.count()
-
-    offset = (page - 1) * items_per_page
-    if items_per_page == -1:
-        users = query.offset(offset).all()
-    else:
-        users = query.offset(offset).limit(items_per_page).all()
+    users = paginate_query(query, Users.id, page, items_per_page, after).all()
+    users, next_cursor = split_page(users, Users.id, items_per_page)
     return ResponseTotalItems(
         data=users,
         total_items=total_items,
+        next_cursor=next_cursor,
         message=Message(detail=Messages.USERS_RETRIEVED_SUCCESS)
     )
 
 
+# The export and search routes are declared before "/{user_id}/" so their paths are not captured as a user ID
+@router.get('/export/', status_code=status.HTTP_200_OK)
+def export_users_endpoint(
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias='format', description="csv or ndjson"),
+        am: Optional[str] = Query(None, description="Filter users by Academic Number (AM)"),
+        role: Optional[str] = Query(None, description="Filter users by role"),
+        department: Optional[Department] = Query(None, description="Filter users by department"),
+        current_user: Users = Depends(get_current_user)):
+    """
+    Stream all the users matching the listing filters as CSV or NDJSON. Only admins can export users.
+
+    The users are read with a server-side cursor and sent in chunks while they are read, so the export
+    uses constant memory whatever the number of users.
+
+    Parameters:
+    - export_format (ExportFormat): The output format, given as `format`.
+    - am (str): Filter by Academic Number.
+    - role (str): Filter by role.
+    - department (str): Filter by department.
+    - current_user (Users): The current user.
+
+    Returns:
+    - StreamingResponse: The exported users.
+
+    Raises:
+    - HTTPException: If the current user is not an admin or the role is invalid.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    user_role = parse_user_role(role)
+
+    def generate_export():
+        with read_session() as db:
+            query = filter_users(db.query(*USER_EXPORT_COLUMNS), am, user_role, department)
+            rows = query.order_by(Users.id).yield_per(EXPORT_CHUNK_SIZE)
+            yield from stream_rows(export_format, [column.key for column in USER_EXPORT_COLUMNS], rows)
+
+    headers = {'Content-Disposition': f'attachment; filename="users.{export_format.value}"'}
+    return StreamingResponse(content=generate_export(), headers=headers,
+                             media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@router.get('/search/', response_model=ResponseWrapper[List[User]], status_code=status.HTTP_200_OK)
+def search_users_endpoint(
+        q: str = Query(..., min_length=1, description="Part of the AM, first or last name"),
+        limit: int = Query(10, ge=1, le=SEARCH_MAX_LIMIT, description="Maximum number of results"),
+        db: Session = Depends(get_read_db),
+        current_user: Users = Depends(get_current_user)):
+    """
+    Search users by AM or name, ignoring accents and case. Only admins and secretaries can search users.
+
+    Parameters:
+    - q (str): The search term.
+    - limit (int): The maximum number of results.
+    - db (Session): The database session.
+    - current_user (Users): The current user.
+
+    Returns:
+    - ResponseWrapper[List[User]]: The matching users, best matches first.
+
+    Raises:
+    - HTTPException: If the current user is not an admin or a secretary.
+    """
+    if not (is_admin(current_user) or is_secretary(current_user)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=Messages.UNAUTHORIZED_USER)
+    users = search_users(db, q, limit)
+    return ResponseWrapper(data=users, message=Message(detail=Messages.USER_SEARCH_RESULTS))
+
+
 @router.post("/", response_model=ResponseWrapper, status_code=status.HTTP_200_OK)
-async def create_return_user_endpoint(response: Response, user_data: UserCreate, db: Session = Depends(get_db)):
+def create_return_user_endpoint(response: Response, user_data: UserCreate, db: Session = Depends(get_db)):
     """
        Endpoint to create a new user or return an existing one based on the Academic Number (AM).
 
@@ -140,8 +223,8 @@ async def create_return_user_endpoint(response: Response, user_data: UserCreate,
 
 
 @router.get("/{user_id}/", response_model=ResponseWrapper[User], status_code=status.HTTP_200_OK)
-async def get_user_by_id_endpoint(user_id: int, db: Session = Depends(get_db),
-                                  current_user: Users = Depends(get_current_user)):
+def get_user_by_id_endpoint(user_id: int, db: Session = Depends(get_db),
+                            current_user: Users = Depends(get_current_user)):
     """
         Retrieves a specific user by their database ID.
 
@@ -175,8 +258,8 @@ async def get_user_by_id_endpoint(user_id: int, db: Session = Depends(get_db),
 
 
 @router.put("/set-admin/{user_id}", response_model=Message, status_code=status.HTTP_200_OK)
-async def set_user_as_admin(user_id: int, db: Session = Depends(get_db),
-                            current_user: Users = Depends(get_current_user)):
+def set_user_as_admin(user_id: int, db: Session = Depends(get_db),
+                      current_user: Users = Depends(get_current_user)):
     """
     Promote a user to admin if the current user is a superadmin.
 
@@ -206,8 +289,8 @@ async def set_user_as_admin(user_id: int, db: Session = Depends(get_db),
 
 
 @router.put("/set-student/{user_id}", response_model=Message, status_code=status.HTTP_200_OK)
-async def set_user_as_student(user_id: int, db: Session = Depends(get_db),
-                              current_user: Users = Depends(get_current_user)):
+def set_user_as_student(user_id: int, db: Session = Depends(get_db),
+                        current_user: Users = Depends(get_current_user)):
     """
     Demote a user to student if the current user is a superadmin.
 
@@ -237,7 +320,7 @@ async def set_user_as_student(user_id: int, db: Session = Depends(get_db),
 
 
 @router.put("/update-profile/{user_id}", response_model=ResponseWrapper[User], status_code=status.HTTP_200_OK)
-async def update_user_profile(
+def update_user_profile(
         user_id: int,
         user_update: UserUpdate,
         db: Session = Depends(get_db),
@@ -0,0 +1,69 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from schemas.internship_schema import InternshipProgram
+from schemas.user_schema import Department
+
+
+class ExportJobStatus(str, Enum):
+    """
+    Enum for the states of a background export job.
+
+    Values:
+    - PENDING: The job is waiting for a free export worker.
+    - RUNNING: The file is being generated.
+    - DONE: The file is ready to be downloaded.
+    - FAILED: The file could not be generated.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ExportFormat(str, Enum):
+    """
+    Enum for the formats of the streamed bulk exports.
+
+    Values:
+    - CSV: Comma separated values with a header row (UTF-8 with BOM, so Excel detects the encoding).
+    - NDJSON: One JSON object per line.
+    """
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ActiveInternshipsExportCreate(BaseModel):
+    """
+    Schema for submitting an export of the active internships.
+
+    Attributes:
+    - department (Optional[Department]): Export only the internships of this department.
+    - program (Optional[InternshipProgram]): Export only the internships of this program.
+    """
+    department: Optional[Department] = None
+    program: Optional[InternshipProgram] = None
+
+
+class ExportJob(BaseModel):
+    """
+    Schema for reading the state of a background export job.
+
+    Attributes:
+    - id (str): The job ID, derived from the filters and the data version.
+    - status (ExportJobStatus): The current state of the job.
+    - filename (str): The name the file is downloaded with.
+    - created_at (datetime): When the job was submitted.
+    - finished_at (Optional[datetime]): When the file was ready or the job failed.
+    """
+    id: str
+    status: ExportJobStatus
+    filename: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Optional, List, Dict
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 
 from schemas.user_schema import Department
 
@@ -147,3 +147,123 @@ class InternshipAllRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class InternshipStatusUpdateOutcome(str, Enum):
+    """
+    Enum for the outcome of one internship in a bulk status update.
+
+    Values:
+    - UPDATED: The status was changed.
+    - UNCHANGED: The internship already had the requested status.
+    - NOT_FOUND: No internship exists with this ID.
+    - FORBIDDEN: The current user may not update this internship.
+    - MISSING_FILES: The required files of the requested status have not been submitted.
+    """
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    MISSING_FILES = "missing_files"
+
+
+class InternshipBulkStatusUpdate(BaseModel):
+    """
+    Schema for changing the status of several internships at once.
+
+    Attributes:
+    - internship_ids (List[int]): The IDs of the internships to update (at most 500).
+    - status (InternshipStatus): The new status of the internships.
+    """
+    internship_ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: InternshipStatus
+
+
+class InternshipBulkDelete(BaseModel):
+    """
+    Schema for deleting several internships at once.
+
+    Attributes:
+    - internship_ids (List[int]): The IDs of the internships to delete (at most 1000).
+    """
+    internship_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class InternshipStatusUpdateResult(BaseModel):
+    """
+    Schema for the result of one internship in a bulk status update.
+
+    Attributes:
+    - id (int): The ID of the internship.
+    - outcome (InternshipStatusUpdateOutcome): What happened to the internship.
+    - detail (Optional[str]): Why the internship was not updated.
+    """
+    id: int
+    outcome: InternshipStatusUpdateOutcome
+    detail: Optional[str] = None
+
+
+class InternshipReadiness(BaseModel):
+    """
+    Schema for the required files an internship has submitted for a review.
+
+    Attributes:
+    - id (int): The unique identifier for the internship.
+    - user_id (int): The ID of the user associated with the internship.
+    - user_first_name (str): The first name of the user.
+    - user_last_name (str): The last name of the user.
+    - user_am (str): The academic number of the user.
+    - program (InternshipProgram): The internship program.
+    - department (Department): The department of the internship.
+    - status (InternshipStatus): The status of the internship.
+    - submitted_files_count (int): How many of the required file types have been submitted.
+    - required_files_count (int): How many file types the program requires.
+    - missing_file_types (List[str]): The required file types that have not been submitted.
+    - ready (bool): Whether all the required files have been submitted.
+    """
+    id: int
+    user_id: int
+    user_first_name: str
+    user_last_name: str
+    user_am: str
+    program: InternshipProgram
+    department: Department
+    status: InternshipStatus
+    submitted_files_count: int
+    required_files_count: int
+    missing_file_types: List[str]
+    ready: bool
+
+
+class InternshipCount(BaseModel):
+    """
+    Schema for the number of internships with a given status, department and program.
+
+    Attributes:
+    - status (InternshipStatus): The status of the internships.
+    - department (Department): The department of the internships.
+    - program (InternshipProgram): The program of the internships.
+    - count (int): The number of internships.
+    """
+    status: InternshipStatus
+    department: Department
+    program: InternshipProgram
+    count: int
+
+
+class InternshipSummary(BaseModel):
+    """
+    Schema for the internship counts of the admin dashboard.
+
+    Attributes:
+    - total (int): The number of internships.
+    - by_status (Dict[InternshipStatus, int]): The number of internships per status.
+    - by_department (Dict[Department, int]): The number of internships per department.
+    - by_program (Dict[InternshipProgram, int]): The number of internships per program.
+    - counts (List[InternshipCount]): The non-zero counts per status, department and program.
+    """
+    total: int
+    by_status: Dict[InternshipStatus, int]
+    by_department: Dict[Department, int]
+    by_program: Dict[InternshipProgram, int]
+    counts: List[InternshipCount]
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class PoolStatus(BaseModel):
+    """
+    Connection pool figures reported by a single worker process.
+
+    Attributes:
+    - pid (int): The process ID of the worker that served the request.
+    - pool_class (str): The SQLAlchemy pool implementation in use.
+    - pool_size (Optional[int]): The configured number of persistent connections.
+    - max_overflow (Optional[int]): The configured number of extra connections allowed above pool_size.
+    - checked_out (Optional[int]): Connections currently in use.
+    - checked_in (Optional[int]): Idle connections currently held by the pool.
+    - overflow (Optional[int]): Current overflow, negative while the pool has not been filled yet.
+    - peak_checked_out (int): The highest number of connections in use at once since the worker started.
+    - total_checkouts (int): Total connection checkouts since the worker started.
+    - timeouts (int): Checkouts that failed because the pool was exhausted for longer than the pool timeout.
+    - wait_count (int): Number of checkouts with a measured wait time.
+    - wait_avg_ms (float): Average time spent waiting for a connection, in milliseconds.
+    - wait_max_ms (float): Longest time spent waiting for a connection, in milliseconds.
+    """
+    pid: int
+    pool_class: str
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None
+    peak_checked_out: int = 0
+    total_checkouts: int = 0
+    timeouts: int = 0
+    wait_count: int = 0
+    wait_avg_ms: float = Field(0.0, description="Average connection wait time in milliseconds")
+    wait_max_ms: float = Field(0.0, description="Maximum connection wait time in milliseconds")
@@ -56,6 +56,7 @@ class ResponseWrapper(GenericModel, Generic[DataT]):
 
 class ResponseTotalItems(ResponseWrapper):
     total_items: int = Field(0, description="Total number of items available for paginated responses.")
+    next_cursor: Optional[str] = Field(None, description="The `after` token of the next page, null on the last page.")
 
     class Config:
         from_attributes = True
@@ -0,0 +1,86 @@
+"""
+Query-count benchmark for the internship listing (`get_all_internships`).
+
+Seeds a throwaway database (in-memory SQLite by default) with internships, then lists them
+with growing page sizes and reports the number of queries and the time of each call. Fails
+when the number of queries changes with the page size, i.e. when rows are loaded one by one.
+
+Usage:
+    python scripts/benchmark_internship_listing.py [--rows N] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.count_cache import count_cache  # noqa: E402
+from crud.intership_crud import get_all_internships  # noqa: E402
+from models import Base, Users, Companies, Internship, Department, InternshipProgram, InternshipStatus  # noqa: E402
+
+PAGE_SIZES = [10, 100, 1000, -1]
+
+
+def seed(db, rows: int):
+    """
+    Insert `rows` students, each with an internship, spread over a few companies.
+    """
+    companies = [Companies(name=f'Company {i}', AFM=f'bench-{i}', email='-', telephone='-', city='-')
+                 for i in range(max(rows // 20, 1))]
+    db.add_all(companies)
+    db.flush()
+    for i in range(rows):
+        user = Users(first_name=f'First {i}', last_name=f'Last {i}', AM=f'bench-{i}')
+        db.add(user)
+        db.flush()
+        db.add(Internship(user_id=user.id, company_id=companies[i % len(companies)].id,
+                          department=Department.IHU_IEE, program=InternshipProgram.ESPA,
+                          status=InternshipStatus.ACTIVE))
+    db.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='Number of internships to seed (default: 2000)')
+    parser.add_argument('--database-url', default='sqlite://',
+                        help='Empty database to seed, its tables are created and dropped (default: in-memory SQLite)')
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, poolclass=StaticPool) if args.database_url == 'sqlite://' \
+        else create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    # Every call should pay for its count query
+    count_cache.enabled = False
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *_: statements.append(1))
+
+    db = sessionmaker(bind=engine)()
+    try:
+        seed(db, args.rows)
+        counts = {}
+        for page_size in PAGE_SIZES:
+            statements.clear()
+            start = perf_counter()
+            internships, total_items, _ = get_all_internships(db, items_per_page=page_size)
+            elapsed = perf_counter() - start
+            counts[page_size] = len(statements)
+            print(f"items_per_page={page_size:>5}: {len(internships):>6} rows, {len(statements)} queries, "
+                  f"{elapsed * 1000:.1f}ms")
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: the number of queries grows with the page size")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
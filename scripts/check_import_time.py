@@ -0,0 +1,69 @@
+"""
+Import-time benchmark for the application module.
+
+Imports `placements` in fresh interpreters and fails when the best run goes over the
+budget, or when one of the heavy optional dependencies is loaded at import time.
+
+Usage:
+    python scripts/check_import_time.py [--budget SECONDS] [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Best-of-5 import time measured at about 1.1-1.25s (Python 3.11), doubled so the check does not
+# flake on slower or busier machines while still catching a heavy dependency loaded at import time
+DEFAULT_BUDGET = 2.5
+
+# Dependencies that must only be loaded by the code paths that use them
+LAZY_MODULES = ['pandas', 'numpy', 'openpyxl', 'twilio', 'requests', 'alembic', 'httpx']
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+start = time.perf_counter()
+import placements
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    """
+    Import the application in a fresh interpreter.
+
+    Returns:
+    - dict: The import time in seconds and the lazy modules that were loaded.
+    """
+    result = subprocess.run([sys.executable, '-W', 'ignore', '-c', IMPORT_SNIPPET], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('IMPORT_TIME_BUDGET', DEFAULT_BUDGET)),
+                        help=f'Maximum import time in seconds (default: {DEFAULT_BUDGET} or $IMPORT_TIME_BUDGET)')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh imports, the best one is kept')
+    args = parser.parse_args()
+
+    runs = [measure_import() for _ in range(args.runs)]
+    best = min(run['elapsed'] for run in runs)
+    loaded = sorted({module for run in runs for module in run['loaded']})
+    print(f"import placements: best {best:.3f}s over {args.runs} runs (budget {args.budget:.3f}s)")
+
+    failed = False
+    if best > args.budget:
+        print(f"FAIL: import time is over the budget by {best - args.budget:.3f}s")
+        failed = True
+    if loaded:
+        print(f"FAIL: modules that should be lazily imported were loaded: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
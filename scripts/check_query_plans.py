@@ -0,0 +1,142 @@
+"""
+Query-plan check for the hot CRUD queries.
+
+Runs the main CRUD functions against the configured database (DATABASE_URL) inside a
+transaction that is rolled back at the end, captures the statements they issue and
+checks with EXPLAIN that each function uses its expected index.
+
+The database must be migrated to the head revision. On Postgres sequential scans are
+disabled for the session, so the check does not depend on the table sizes.
+
+Usage:
+    python scripts/check_query_plans.py
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crud.company_answer_crud import get_question_with_company_answers  # noqa: E402
+from crud.dikaiologitika_crud import get_files_by_user_id  # noqa: E402
+from crud.intership_crud import get_user_internship, get_all_internships, check_required_files_submitted, \
+    fetch_active_internships_with_details  # noqa: E402
+from crud.otp_crud import validate_otp, cleanup_expired_otps  # noqa: E402
+from crud.user_answer_crud import get_question_with_user_answers  # noqa: E402
+from database import engine  # noqa: E402
+from models import Users, Companies, Internship, Question, UserAnswer, CompanyAnswer, OTP, Department, \
+    InternshipProgram, InternshipStatus, DikaiologitikaType, SubmissionTime, QuestionType, QuestionnaireType  # noqa: E402
+
+
+def seed(db: Session) -> dict:
+    """
+    Insert the minimal rows the CRUD functions need to reach their queries.
+    """
+    user = Users(first_name='Plan', last_name='Check', AM='plan-check')
+    company = Companies(name='Plan Check', AFM='plan-check', email='-', telephone='-', city='-')
+    db.add_all([user, company])
+    db.flush()
+    internship = Internship(user_id=user.id, company_id=company.id, department=Department.IHU_IEE,
+                            program=InternshipProgram.ESPA, status=InternshipStatus.ACTIVE)
+    question = Question(question_text='Plan check', question_type=QuestionType.FREE_TEXT,
+                        question_questionnaire=QuestionnaireType.STUDENT)
+    db.add_all([internship, question])
+    db.flush()
+    db.add_all([
+        UserAnswer(user_id=user.id, question_id=question.id, answer_text='-'),
+        CompanyAnswer(internship_id=internship.id, question_id=question.id, answer_text='-'),
+        OTP(user_id=user.id, otp='000000', expiry=datetime.now() + timedelta(days=1)),
+    ])
+    db.flush()
+    return {'user_id': user.id, 'internship_id': internship.id}
+
+
+# (description, CRUD call, accepted index names)
+CHECKS = [
+    ('get_files_by_user_id by type',
+     lambda db, ids: get_files_by_user_id(db, ids['user_id'], file_type=DikaiologitikaType.AitisiPraktikis),
+     ('ix_dikaiologitika_user_id_type',)),
+    ('check_required_files_submitted',
+     lambda db, ids: check_required_files_submitted(db, ids['user_id'], InternshipProgram.ESPA, SubmissionTime.START),
+     ('ix_dikaiologitika_user_id_type',)),
+    ('get_user_internship',
+     lambda db, ids: get_user_internship(db, ids['user_id']),
+     ('ix_internships_user_id',)),
+    ('get_all_internships with status, department and program',
+     lambda db, ids: get_all_internships(db, internship_status=InternshipStatus.ACTIVE, department=Department.IHU_IEE,
+                                         program=InternshipProgram.ESPA),
+     ('ix_internships_status_department_program', 'ix_internships_active_department_program')),
+    ('fetch_active_internships_with_details',
+     lambda db, ids: list(fetch_active_internships_with_details(db, InternshipProgram.ESPA, Department.IHU_IEE)),
+     ('ix_internships_active_department_program', 'ix_internships_status_department_program')),
+    ('get_question_with_user_answers',
+     lambda db, ids: get_question_with_user_answers(db, ids['user_id']),
+     ('ix_user_answers_user_id_question_id',)),
+    ('get_question_with_company_answers',
+     lambda db, ids: get_question_with_company_answers(db, ids['internship_id']),
+     ('ix_company_answers_internship_id_question_id',)),
+    ('validate_otp',
+     lambda db, ids: validate_otp(db, '000000'),
+     ('ix_otps_otp',)),
+    ('cleanup_expired_otps',
+     lambda db, ids: cleanup_expired_otps(db),
+     ('ix_otps_expiry',)),
+]
+
+
+def explain(connection, statement: str, parameters) -> str:
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def main() -> int:
+    failed = False
+    with engine.connect() as connection:
+        dbapi_connection = connection.connection.driver_connection
+        if connection.dialect.name == 'sqlite':
+            # pysqlite defers BEGIN and would let a released savepoint commit, so the transaction is begun explicitly
+            dbapi_connection.isolation_level = None
+        transaction = connection.begin()
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql("BEGIN")
+        elif connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        # Commits inside the CRUD functions only release a savepoint, the outer transaction is rolled back
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        ids = seed(db)
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and not statement.lstrip().upper().startswith(('EXPLAIN', 'SAVEPOINT', 'RELEASE')):
+                captured.append((statement, parameters))
+
+        event.listen(connection, 'before_cursor_execute', capture)
+        try:
+            for description, call, index_names in CHECKS:
+                captured.clear()
+                call(db, ids)
+                statements = list(captured)
+                plans = [explain(connection, statement, parameters) for statement, parameters in statements]
+                if any(name in plan for plan in plans for name in index_names):
+                    print(f"ok    {description}")
+                else:
+                    failed = True
+                    print(f"FAIL  {description}: none of {', '.join(index_names)} used")
+                    for plan in plans:
+                        print('      ' + plan.replace('\n', '\n      '))
+        finally:
+            event.remove(connection, 'before_cursor_execute', capture)
+            db.close()
+            transaction.rollback()
+            if connection.dialect.name == 'sqlite':
+                dbapi_connection.isolation_level = ''
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
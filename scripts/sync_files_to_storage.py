@@ -0,0 +1,93 @@
+"""
+Copy the uploaded files from the local files directory to the S3 bucket, under the same keys.
+
+Switching STORAGE_BACKEND from 'local' to 's3' does not move the stored files: the `file_path`
+of the dikaiologitika and the `path` of the blobs are the keys of the files, which only exist on
+the local disk until they are copied. Files missing from the bucket would be served as 404.
+
+Every key referenced by the database (DATABASE_URL) is copied from the working directory to the
+bucket of the S3_* settings, unless the bucket already holds a file of the same size, so the
+script can be run again. Local files are kept.
+
+Cutover:
+    1. With the app still on the local storage, run the script (copies the bulk of the files).
+    2. Set STORAGE_BACKEND=s3 and restart the app.
+    3. Run the script again, to copy the files uploaded between the two runs.
+    4. Once the downloads are checked, the local files directory can be archived.
+
+Usage:
+    python scripts/sync_files_to_storage.py [--workers N] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.storage import LocalStorage, StorageBackend, FILES_ROOT, create_s3_storage  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from models import Blob, Dikaiologitika  # noqa: E402
+
+
+def stored_keys() -> list:
+    """
+    Return the keys of every file referenced by the database.
+    """
+    db = SessionLocal()
+    try:
+        paths = db.query(Dikaiologitika.file_path).filter(Dikaiologitika.file_path.isnot(None)) \
+            .union(db.query(Blob.path)).all()
+    finally:
+        db.close()
+    return sorted(path for path, in paths if path)
+
+
+def sync_file(source: LocalStorage, target: StorageBackend, key: str, dry_run: bool) -> str:
+    """
+    Copy a file to the target storage unless it is already there, returning what was done.
+    """
+    local = source.stat(key)
+    if local is None:
+        return 'missing'
+    remote = target.stat(key)
+    if remote is not None and remote.size == local.size:
+        return 'skipped'
+    if not dry_run:
+        target.put_file(key, key)
+    return 'copied'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8, help='Files copied concurrently (default: 8)')
+    parser.add_argument('--dry-run', action='store_true', help='Only report the files that would be copied')
+    args = parser.parse_args()
+
+    source = LocalStorage(FILES_ROOT)
+    target = create_s3_storage()
+    keys = stored_keys()
+    results = {'copied': 0, 'skipped': 0, 'missing': 0, 'failed': 0}
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {key: executor.submit(sync_file, source, target, key, args.dry_run) for key in keys}
+            for key, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"FAILED {key}: {e}")
+                    result = 'failed'
+                if result == 'missing':
+                    print(f"MISSING {key}: not found locally")
+                results[result] += 1
+    finally:
+        target.close()
+
+    action = 'would be copied' if args.dry_run else 'copied'
+    print(f"{len(keys)} files: {results['copied']} {action}, {results['skipped']} already in the bucket, "
+          f"{results['missing']} missing locally, {results['failed']} failed")
+    return 1 if results['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
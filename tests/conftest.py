@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The settings the app requires at import time, the tests use their own in-memory database
+for name, value in {
+    'SECRET_KEY': 'test',
+    'CLIENT_ID': 'test',
+    'CLIENT_SECRET': 'test',
+    'ENVIRONMENT': 'test',
+    'DATABASE_URL': 'sqlite://',
+    'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+    'TWILIO_AUTH_TOKEN': 'test',
+    'TWILIO_PHONE_NUMBER': 'test',
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from crud.intership_crud import get_internships_readiness
+from database import Base
+from models import Users, UserRole, Internship, Department, InternshipProgram, InternshipStatus, SubmissionTime
+
+
+@pytest.fixture
+def db():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_readiness_of_a_student_without_name(db):
+    student = Users(first_name=None, last_name=None, AM=None, role=UserRole.STUDENT)
+    db.add(student)
+    db.flush()
+    db.add(Internship(user_id=student.id, department=Department.IHU_IEE, program=InternshipProgram.ESPA,
+                      status=InternshipStatus.ACTIVE))
+    db.commit()
+
+    readiness = get_internships_readiness(db, SubmissionTime.START)
+
+    assert len(readiness) == 1
+    assert (readiness[0].user_first_name, readiness[0].user_last_name, readiness[0].user_am) == ('', '', '')
+    assert not readiness[0].ready
@@ -1,8 +1,7 @@
 import logging
+from functools import lru_cache
 
 from tenacity import retry, wait_fixed, stop_after_attempt
-from twilio.base.exceptions import TwilioRestException
-from twilio.rest import Client
 
 from core.config import settings
 
@@ -10,8 +9,20 @@ from core.config import settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize the Twilio client using credentials from settings
-twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+
+@lru_cache(maxsize=None)
+def get_twilio_client():
+    """
+    Create the Twilio client on first use, using credentials from settings.
+
+    The Twilio SDK is imported here so that it is only loaded once an SMS is actually sent.
+
+    Returns:
+    - Client: The shared Twilio REST client.
+    """
+    from twilio.rest import Client
+
+    return Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 
 
 @retry(wait=wait_fixed(2), stop=stop_after_attempt(3), reraise=True)
@@ -25,9 +36,11 @@ def send_sms(to_phone_number: str, message: str):
 
     Retries up to 3 times with a 2-second wait between attempts if an error occurs.
     """
+    from twilio.base.exceptions import TwilioRestException
+
     try:
         # Send the SMS message using the Twilio client
-        message = twilio_client.messages.create(
+        message = get_twilio_client().messages.create(
             body=message,
             from_=settings.TWILIO_PHONE_NUMBER,
             to=to_phone_number